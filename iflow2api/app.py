@@ -2,23 +2,23 @@
 
 import sys
 import json
+import hmac
 import logging
-import uuid
+import os
 import asyncio
 import time
 from contextlib import asynccontextmanager
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse, HTMLResponse
+from fastapi.responses import JSONResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, ConfigDict
 
 logger = logging.getLogger("iflow2api")
 
-from .config import load_iflow_config, check_iflow_login, IFlowConfig, save_iflow_config
-from .proxy import IFlowProxy
+from .config import load_iflow_config, check_iflow_login, IFlowConfig, save_iflow_config, APP_CONFIG_PATH
+from .proxy import IFlowProxy, SSE_DATA_PREFIX, SSE_FRAME_END, SSE_DONE_FRAME
 from .token_refresher import OAuthTokenRefresher
 from .vision import (
     is_vision_model,
@@ -30,6 +30,7 @@ from .vision import (
     get_max_images,
     DEFAULT_VISION_MODEL,
 )
+from . import jsonutil
 from .version import get_version, get_startup_info, get_diagnostic_info, is_docker
 
 
@@ -80,12 +81,12 @@ def openai_to_anthropic_response(openai_response: dict, model: str) -> dict:
         for tc in tool_calls:
             func = tc.get("function", {})
             try:
-                tool_input = json.loads(func.get("arguments", "{}") or "{}")
-            except (json.JSONDecodeError, TypeError):
+                tool_input = jsonutil.loads(func.get("arguments", "{}") or "{}")
+            except (jsonutil.JSONDecodeError, TypeError):
                 tool_input = {"_raw": func.get("arguments", "")}
             content_blocks.append({
                 "type": "tool_use",
-                "id": tc.get("id") or f"toolu_{uuid.uuid4().hex[:24]}",
+                "id": tc.get("id") or "toolu_" + os.urandom(12).hex(),
                 "name": func.get("name", ""),
                 "input": tool_input,
             })
@@ -109,7 +110,7 @@ def openai_to_anthropic_response(openai_response: dict, model: str) -> dict:
     openai_usage = openai_response.get("usage", {})
 
     return {
-        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "id": "msg_" + os.urandom(12).hex(),
         "type": "message",
         "role": "assistant",
         "content": content_blocks,
@@ -123,45 +124,54 @@ def openai_to_anthropic_response(openai_response: dict, model: str) -> dict:
     }
 
 
-def create_anthropic_stream_message_start(model: str) -> str:
+# 固定不变的 SSE 帧片段在导入时预先构建，流式过程中只拼接变化的部分
+_MESSAGE_START_PREFIX = b'event: message_start\ndata: {"type":"message_start","message":{"id":"'
+_MESSAGE_START_MIDDLE = b'","type":"message","role":"assistant","content":[],"model":'
+_MESSAGE_START_SUFFIX = (
+    b',"stop_reason":null,"stop_sequence":null,'
+    b'"usage":{"input_tokens":0,"output_tokens":0}}}\n\n'
+)
+_CONTENT_BLOCK_START_PREFIX = b'event: content_block_start\ndata: {"type":"content_block_start","index":'
+_CONTENT_BLOCK_START_SUFFIXES = {
+    "text": b',"content_block":{"type":"text","text":""}}\n\n',
+    "thinking": b',"content_block":{"type":"thinking","thinking":""}}\n\n',
+}
+_CONTENT_BLOCK_DELTA_PREFIX = b'event: content_block_delta\ndata: {"type":"content_block_delta","index":'
+_CONTENT_BLOCK_DELTA_MIDDLES = {
+    "text_delta": b',"delta":{"type":"text_delta","text":',
+    "thinking_delta": b',"delta":{"type":"thinking_delta","thinking":',
+    "input_json_delta": b',"delta":{"type":"input_json_delta","partial_json":',
+}
+_CONTENT_BLOCK_DELTA_SUFFIX = b'}}\n\n'
+_TOOL_USE_BLOCK_START_MIDDLE = b',"content_block":{"type":"tool_use","id":'
+_CONTENT_BLOCK_STOP_PREFIX = b'event: content_block_stop\ndata: {"type":"content_block_stop","index":'
+_MESSAGE_DELTA_PREFIX = b'event: message_delta\ndata: {"type":"message_delta","delta":{"stop_reason":'
+_MESSAGE_DELTA_MIDDLE = b',"stop_sequence":null},"usage":{"output_tokens":'
+_MESSAGE_STOP_FRAME = b'event: message_stop\ndata: {"type":"message_stop"}\n\n'
+
+
+def create_anthropic_stream_message_start(model: str) -> bytes:
     """创建 Anthropic 流式响应的 message_start 事件"""
-    msg_id = f"msg_{uuid.uuid4().hex[:24]}"
-    data = {
-        "type": "message_start",
-        "message": {
-            "id": msg_id,
-            "type": "message",
-            "role": "assistant",
-            "content": [],
-            "model": model,
-            "stop_reason": None,
-            "stop_sequence": None,
-            "usage": {"input_tokens": 0, "output_tokens": 0}
-        }
-    }
-    return f"event: message_start\ndata: {json.dumps(data)}\n\n"
+    msg_id = "msg_" + os.urandom(12).hex()
+    return (
+        _MESSAGE_START_PREFIX + msg_id.encode("ascii")
+        + _MESSAGE_START_MIDDLE + jsonutil.dumps(model)
+        + _MESSAGE_START_SUFFIX
+    )
 
 
-def create_anthropic_content_block_start(index: int = 0, block_type: str = "text") -> str:
+def create_anthropic_content_block_start(index: int = 0, block_type: str = "text") -> bytes:
     """创建 Anthropic 流式响应的 content_block_start 事件
     
     Args:
         index: 内容块索引
         block_type: 内容块类型 ("text" 或 "thinking")
     """
-    if block_type == "thinking":
-        content_block = {"type": "thinking", "thinking": ""}
-    else:
-        content_block = {"type": "text", "text": ""}
-    data = {
-        "type": "content_block_start",
-        "index": index,
-        "content_block": content_block
-    }
-    return f"event: content_block_start\ndata: {json.dumps(data)}\n\n"
+    suffix = _CONTENT_BLOCK_START_SUFFIXES.get(block_type, _CONTENT_BLOCK_START_SUFFIXES["text"])
+    return _CONTENT_BLOCK_START_PREFIX + b"%d" % index + suffix
 
 
-def create_anthropic_content_block_delta(text: str, index: int = 0, delta_type: str = "text_delta") -> str:
+def create_anthropic_content_block_delta(text: str, index: int = 0, delta_type: str = "text_delta") -> bytes:
     """创建 Anthropic 流式响应的 content_block_delta 事件
     
     Args:
@@ -169,79 +179,70 @@ def create_anthropic_content_block_delta(text: str, index: int = 0, delta_type:
         index: 内容块索引
         delta_type: delta 类型 ("text_delta" 或 "thinking_delta")
     """
-    if delta_type == "thinking_delta":
-        delta = {"type": "thinking_delta", "thinking": text}
-    else:
-        delta = {"type": "text_delta", "text": text}
-    data = {
-        "type": "content_block_delta",
-        "index": index,
-        "delta": delta
-    }
-    return f"event: content_block_delta\ndata: {json.dumps(data)}\n\n"
+    middle = _CONTENT_BLOCK_DELTA_MIDDLES["thinking_delta" if delta_type == "thinking_delta" else "text_delta"]
+    # 固定结构直接拼接字节，只对文本本身做 JSON 编码（流式输出中最频繁的事件）
+    return (
+        _CONTENT_BLOCK_DELTA_PREFIX + b"%d" % index
+        + middle + jsonutil.dumps(text) + _CONTENT_BLOCK_DELTA_SUFFIX
+    )
 
 
-def create_anthropic_content_block_stop(index: int = 0) -> str:
+def create_anthropic_content_block_stop(index: int = 0) -> bytes:
     """创建 Anthropic 流式响应的 content_block_stop 事件
     
     Args:
         index: 内容块索引
     """
-    data = {"type": "content_block_stop", "index": index}
-    return f"event: content_block_stop\ndata: {json.dumps(data)}\n\n"
+    return _CONTENT_BLOCK_STOP_PREFIX + b"%d}\n\n" % index
 
 
-def create_anthropic_message_delta(stop_reason: str = "end_turn", output_tokens: int = 0) -> str:
+def create_anthropic_message_delta(stop_reason: str = "end_turn", output_tokens: int = 0) -> bytes:
     """创建 Anthropic 流式响应的 message_delta 事件"""
-    data = {
-        "type": "message_delta",
-        "delta": {"stop_reason": stop_reason, "stop_sequence": None},
-        "usage": {"output_tokens": output_tokens}
-    }
-    return f"event: message_delta\ndata: {json.dumps(data)}\n\n"
+    return (
+        _MESSAGE_DELTA_PREFIX + jsonutil.dumps(stop_reason)
+        + _MESSAGE_DELTA_MIDDLE + b"%d}}\n\n" % output_tokens
+    )
 
 
-def create_anthropic_message_stop() -> str:
+def create_anthropic_message_stop() -> bytes:
     """创建 Anthropic 流式响应的 message_stop 事件"""
-    data = {"type": "message_stop"}
-    return f"event: message_stop\ndata: {json.dumps(data)}\n\n"
+    return _MESSAGE_STOP_FRAME
 
 
-def create_anthropic_tool_use_block_start(index: int, tool_use_id: str, name: str) -> str:
+def create_anthropic_tool_use_block_start(index: int, tool_use_id: str, name: str) -> bytes:
     """创建 Anthropic 流式响应的 tool_use content_block_start 事件"""
-    data = {
-        "type": "content_block_start",
-        "index": index,
-        "content_block": {"type": "tool_use", "id": tool_use_id, "name": name, "input": {}}
-    }
-    return f"event: content_block_start\ndata: {json.dumps(data)}\n\n"
+    return (
+        _CONTENT_BLOCK_START_PREFIX + b"%d" % index
+        + _TOOL_USE_BLOCK_START_MIDDLE + jsonutil.dumps(tool_use_id)
+        + b',"name":' + jsonutil.dumps(name) + b',"input":{}}}\n\n'
+    )
 
 
-def create_anthropic_input_json_delta(partial_json: str, index: int) -> str:
+def create_anthropic_input_json_delta(partial_json: str, index: int) -> bytes:
     """创建 Anthropic 流式响应的 input_json_delta content_block_delta 事件"""
-    data = {
-        "type": "content_block_delta",
-        "index": index,
-        "delta": {"type": "input_json_delta", "partial_json": partial_json}
-    }
-    return f"event: content_block_delta\ndata: {json.dumps(data)}\n\n"
+    return (
+        _CONTENT_BLOCK_DELTA_PREFIX + b"%d" % index
+        + _CONTENT_BLOCK_DELTA_MIDDLES["input_json_delta"] + jsonutil.dumps(partial_json)
+        + _CONTENT_BLOCK_DELTA_SUFFIX
+    )
 
 
-def parse_openai_sse_chunk(line: str) -> Optional[dict]:
-    """解析 OpenAI SSE 流式数据块"""
-    line = line.strip()
-    if not line or line == "data: [DONE]" or line == "data:[DONE]":
+def parse_openai_sse_chunk(line: bytes | bytearray) -> Optional[dict]:
+    """解析 OpenAI SSE 流式数据块（直接处理按换行切分后的原始字节行）"""
+    # 非 data 行（空行、event/注释行）直接忽略
+    if not line.startswith(b"data:"):
         return None
     # iFlow 使用 "data:" 没有空格，标准SSE使用 "data: "
-    if line.startswith("data:"):
-        data_str = line[5:].strip()  # 去掉 "data:" 前缀
-        if not data_str or data_str == "[DONE]":
-            return None
-        try:
-            return json.loads(data_str)
-        except json.JSONDecodeError:
-            return None
-    return None
+    payload = line[5:].lstrip()
+    # 按 \n 切分后，CRLF 结尾的行只会残留一个 \r
+    if payload.endswith(b"\r"):
+        payload = payload[:-1]
+    if not payload or payload == b"[DONE]":
+        return None
+    try:
+        return jsonutil.loads(payload)
+    except jsonutil.JSONDecodeError:
+        return None
 
 
 def extract_content_from_delta(delta: dict, preserve_reasoning: bool = False) -> tuple[str, str]:
@@ -286,6 +287,20 @@ def extract_content_from_delta(delta: dict, preserve_reasoning: bool = False) ->
 # 用户可通过 ANTHROPIC_MODEL 环境变量指定默认模型
 DEFAULT_IFLOW_MODEL = "glm-5"
 
+# iFlow 已知模型 ID（与 proxy.py get_models() 保持一致）
+_KNOWN_IFLOW_MODELS = frozenset({
+    # 文本模型
+    "glm-4.6", "glm-4.7", "glm-5",
+    "iFlow-ROME-30BA3B", "deepseek-v3.2-chat",
+    "qwen3-coder-plus", "kimi-k2", "kimi-k2-thinking", "kimi-k2.5",
+    "kimi-k2-0905",  # L-02 修复：补充缺失模型
+    "minimax-m2.5",
+    # 视觉模型
+    "glm-4v", "glm-4v-plus", "glm-4v-flash", "glm-4.5v", "glm-4.6v",
+    "moonshot-v1-8k-vision", "moonshot-v1-32k-vision", "moonshot-v1-128k-vision",
+    "qwen-vl-plus", "qwen-vl-max", "qwen2.5-vl", "qwen3-vl",
+})
+
 
 def get_mapped_model(anthropic_model: str, has_images: bool = False) -> str:
     """
@@ -301,28 +316,36 @@ def get_mapped_model(anthropic_model: str, has_images: bool = False) -> str:
     Returns:
         映射后的模型名
     """
-    # iFlow 已知模型 ID（与 proxy.py get_models() 保持一致）
-    known_iflow_models = {
-        # 文本模型
-        "glm-4.6", "glm-4.7", "glm-5",
-        "iFlow-ROME-30BA3B", "deepseek-v3.2-chat",
-        "qwen3-coder-plus", "kimi-k2", "kimi-k2-thinking", "kimi-k2.5",
-        "kimi-k2-0905",  # L-02 修复：补充缺失模型
-        "minimax-m2.5",
-        # 视觉模型
-        "glm-4v", "glm-4v-plus", "glm-4v-flash", "glm-4.5v", "glm-4.6v",
-        "moonshot-v1-8k-vision", "moonshot-v1-32k-vision", "moonshot-v1-128k-vision",
-        "qwen-vl-plus", "qwen-vl-max", "qwen2.5-vl", "qwen3-vl",
-    }
-    
-    if anthropic_model in known_iflow_models:
+    if anthropic_model in _KNOWN_IFLOW_MODELS:
         return anthropic_model
     
-    # Claude 系列模型名回退到默认模型
-    logger.info("模型映射: %s → %s", anthropic_model, DEFAULT_IFLOW_MODEL)
+    # Claude 系列模型名回退到默认模型（请求日志中已包含映射结果，这里仅调试输出）
+    logger.debug("模型映射: %s → %s", anthropic_model, DEFAULT_IFLOW_MODEL)
     return DEFAULT_IFLOW_MODEL
 
 
+def _split_text_blocks(blocks: list) -> tuple[list[str], list]:
+    """单次遍历内容块，拆分出文本与其他块
+
+    Returns:
+        (文本列表, 其他块列表)。文本列表中 {"type": "text"} 块的文本在前、
+        裸字符串在后，与此前的拼接顺序保持一致。
+    """
+    texts: list[str] = []
+    raw_strings: list[str] = []
+    others: list = []
+    for b in blocks:
+        if isinstance(b, str):
+            raw_strings.append(b)
+        elif isinstance(b, dict) and b.get("type") == "text":
+            texts.append(b.get("text", ""))
+        else:
+            others.append(b)
+    if raw_strings:
+        texts.extend(raw_strings)
+    return texts, others
+
+
 def anthropic_to_openai_request(body: dict) -> dict:
     """
     将 Anthropic Messages API 请求体转换为 OpenAI Chat Completions 格式。
@@ -359,8 +382,8 @@ def anthropic_to_openai_request(body: dict) -> dict:
     has_images = False
     for msg in body.get("messages", []):
         content = msg.get("content", "")
-        images = detect_image_content(content)
-        if images:
+        # 字符串内容不可能包含图像，跳过检测
+        if isinstance(content, list) and detect_image_content(content):
             has_images = True
             break
     
@@ -373,9 +396,14 @@ def anthropic_to_openai_request(body: dict) -> dict:
     if system:
         if isinstance(system, list):
             # Anthropic 格式: [{"type": "text", "text": "..."}]
-            system_text = " ".join(
-                block.get("text", "") for block in system if block.get("type") == "text"
-            )
+            if len(system) == 1:
+                # 常见情况只有一个块，无需 join
+                block = system[0]
+                system_text = block.get("text", "") if block.get("type") == "text" else ""
+            else:
+                system_text = " ".join(
+                    block.get("text", "") for block in system if block.get("type") == "text"
+                )
         else:
             system_text = str(system)
         if system_text:
@@ -386,80 +414,80 @@ def anthropic_to_openai_request(body: dict) -> dict:
         role = msg.get("role", "user")
         content = msg.get("content", "")
 
-        if isinstance(content, list):
-            if role == "assistant":
-                # 提取文本块和 tool_use 块
-                tool_use_blocks = [b for b in content if isinstance(b, dict) and b.get("type") == "tool_use"]
-                text_parts = [
-                    b.get("text", "") for b in content
-                    if isinstance(b, dict) and b.get("type") == "text"
-                ] + [b for b in content if isinstance(b, str)]
-
-                openai_msg: dict = {"role": "assistant"}
-                text_content = "\n".join(text_parts)
-                openai_msg["content"] = text_content if text_content else None
-
-                if tool_use_blocks:
-                    openai_msg["tool_calls"] = [
-                        {
-                            "id": b.get("id") or f"call_{uuid.uuid4().hex[:24]}",
-                            "type": "function",
-                            "function": {
-                                "name": b.get("name", ""),
-                                "arguments": json.dumps(b.get("input", {}), ensure_ascii=False),
-                            },
-                        }
-                        for b in tool_use_blocks
-                    ]
-                messages.append(openai_msg)
-
-            else:  # role == "user"
-                # 先处理 tool_result 块 → 转成 role=tool 消息
-                tool_result_blocks = [b for b in content if isinstance(b, dict) and b.get("type") == "tool_result"]
-                for tr in tool_result_blocks:
-                    tr_content = tr.get("content", "")
-                    if isinstance(tr_content, list):
-                        tr_text = "\n".join(
-                            tc.get("text", "") for tc in tr_content
-                            if isinstance(tc, dict) and tc.get("type") == "text"
-                        )
-                    else:
-                        tr_text = str(tr_content) if tr_content else ""
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tr.get("tool_use_id", ""),
-                        "content": tr_text,
-                    })
-
-                # 处理剩余内容（文本 / 图像）
-                remaining = [b for b in content if not (isinstance(b, dict) and b.get("type") == "tool_result")]
-                if remaining:
-                    images = detect_image_content(remaining)
-                    if images:
-                        # 有图像，使用 OpenAI 多模态格式
-                        text_parts = [
-                            b.get("text", "") for b in remaining
-                            if isinstance(b, dict) and b.get("type") == "text"
-                        ] + [b for b in remaining if isinstance(b, str)]
-                        multimodal_content = []
-                        combined_text = "\n".join(text_parts)
-                        if combined_text.strip():
-                            multimodal_content.append({"type": "text", "text": combined_text})
-                        from .vision import convert_to_openai_format
-                        multimodal_content.extend(convert_to_openai_format(images))
-                        messages.append({"role": "user", "content": multimodal_content})
-                    else:
-                        # 无图像，提取纯文本
-                        text_parts = [
-                            b.get("text", "") for b in remaining
-                            if isinstance(b, dict) and b.get("type") == "text"
-                        ] + [b for b in remaining if isinstance(b, str)]
-                        combined = "\n".join(text_parts)
-                        if combined or not tool_result_blocks:
-                            messages.append({"role": "user", "content": combined})
-                # 如果只有 tool_result 没有额外文本/图像，则不追加 user 消息
-        else:
+        # 快速路径：字符串内容（最常见）直接透传
+        if not isinstance(content, list):
             messages.append({"role": role, "content": content})
+            continue
+
+        if role == "assistant":
+            # 提取文本块和 tool_use 块
+            text_parts, others = _split_text_blocks(content)
+            tool_use_blocks = [b for b in others if isinstance(b, dict) and b.get("type") == "tool_use"]
+
+            openai_msg: dict = {"role": "assistant"}
+            text_content = "\n".join(text_parts)
+            openai_msg["content"] = text_content if text_content else None
+
+            if tool_use_blocks:
+                openai_msg["tool_calls"] = [
+                    {
+                        "id": b.get("id") or "call_" + os.urandom(12).hex(),
+                        "type": "function",
+                        "function": {
+                            "name": b.get("name", ""),
+                            "arguments": json.dumps(b.get("input", {}), ensure_ascii=False),
+                        },
+                    }
+                    for b in tool_use_blocks
+                ]
+            messages.append(openai_msg)
+
+        else:  # role == "user"
+            # 单次遍历拆分 tool_result 块与剩余内容
+            tool_result_blocks = []
+            remaining = []
+            for b in content:
+                if isinstance(b, dict) and b.get("type") == "tool_result":
+                    tool_result_blocks.append(b)
+                else:
+                    remaining.append(b)
+
+            # 先处理 tool_result 块 → 转成 role=tool 消息
+            for tr in tool_result_blocks:
+                tr_content = tr.get("content", "")
+                if isinstance(tr_content, list):
+                    tr_text = "\n".join(
+                        tc.get("text", "") for tc in tr_content
+                        if isinstance(tc, dict) and tc.get("type") == "text"
+                    )
+                else:
+                    tr_text = str(tr_content) if tr_content else ""
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": tr.get("tool_use_id", ""),
+                    "content": tr_text,
+                })
+
+            # 处理剩余内容（文本 / 图像）
+            if remaining:
+                text_parts, others = _split_text_blocks(remaining)
+                # 图像只可能出现在非文本块中
+                images = detect_image_content(others) if others else []
+                if images:
+                    # 有图像，使用 OpenAI 多模态格式
+                    multimodal_content = []
+                    combined_text = "\n".join(text_parts)
+                    if combined_text.strip():
+                        multimodal_content.append({"type": "text", "text": combined_text})
+                    from .vision import convert_to_openai_format
+                    multimodal_content.extend(convert_to_openai_format(images))
+                    messages.append({"role": "user", "content": multimodal_content})
+                else:
+                    # 无图像，提取纯文本
+                    combined = "\n".join(text_parts)
+                    if combined or not tool_result_blocks:
+                        messages.append({"role": "user", "content": combined})
+            # 如果只有 tool_result 没有额外文本/图像，则不追加 user 消息
 
     openai_body["messages"] = messages
 
@@ -529,6 +557,10 @@ def get_proxy() -> IFlowProxy:
     """获取代理实例
     
     如果 iFlow 配置不存在，抛出 IFlowNotConfiguredError 异常。
+
+    正常情况下代理已在 lifespan 启动时创建，请求处理直接读取 app.state.proxy；
+    这里只处理启动后才完成登录的情况。函数内没有 await，在事件循环中不会与
+    其他协程交错执行，因此不会重复创建实例。
     """
     global _proxy, _config
     if _proxy is None:
@@ -539,6 +571,8 @@ def get_proxy() -> IFlowProxy:
             raise IFlowNotConfiguredError(
                 "iFlow 未配置，请通过 WebUI 完成登录: http://localhost:28000/admin"
             ) from e
+        # 启动后才完成登录时，同步到 app.state 供后续请求直接使用
+        app.state.proxy = _proxy
     return _proxy
 
 
@@ -583,9 +617,7 @@ async def lifespan(app: FastAPI):
     # 尝试加载 iFlow 配置（可选）
     # 优先检查应用主配置 ~/.iflow2api/config.json（用户通过 WebUI 登录后保存）
     # 其次检查 iFlow CLI 配置 ~/.iflow/settings.json
-    from pathlib import Path
-    app_config_path = Path.home() / ".iflow2api" / "config.json"
-    app_config_exists = app_config_path.exists()
+    app_config_exists = APP_CONFIG_PATH.exists()
     
     try:
         config = load_iflow_config()
@@ -595,6 +627,11 @@ async def lifespan(app: FastAPI):
         logger.info("API Key: ****%s (masked)", config.api_key[-4:])
         if config.model_name:
             logger.info("默认模型: %s", config.model_name)
+
+        # 启动时即创建代理实例并绑定到 app.state，请求处理时直接读取
+        if _proxy is None:
+            _proxy = IFlowProxy(config)
+        app.state.proxy = _proxy
             
         # 启动 Token 刷新任务
         _refresher = OAuthTokenRefresher()
@@ -621,11 +658,83 @@ async def lifespan(app: FastAPI):
         _refresher.stop()
         _refresher = None
         
+    app.state.proxy = None
     if _proxy:
         await _proxy.close()
         _proxy = None
 
 
+class FastJSONResponse(JSONResponse):
+    """JSON 响应 - 使用 orjson 序列化（不可用时回退标准库 json）"""
+
+    def render(self, content: Any) -> bytes:
+        return jsonutil.dumps(content)
+
+
+# SSE 响应头（content-type 由 media_type 生成）
+_SSE_HEADERS = {
+    "cache-control": "no-cache",
+    "connection": "keep-alive",
+    "x-accel-buffering": "no",
+}
+
+
+class SSEStreamResponse(Response):
+    """SSE 流式响应 - 纯 ASGI 实现
+
+    直接将生成器产出的 bytes 通过 send() 写出，不经过 StreamingResponse 的
+    任务组/取消作用域。发送循环在一个任务中运行，另一个任务监听 http.disconnect，
+    客户端断开后取消发送任务（上游长时间无数据时也能立即停止），并关闭生成器
+    （释放上游连接与请求锁）。每块数据不再额外创建任务。
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterator[bytes]) -> None:
+        # 与 StreamingResponse 相同：不调用 Response.__init__（否则会按空 body 写入
+        # content-length: 0），只初始化状态码、媒体类型和 raw_headers/headers
+        self.body_iterator = content
+        self.status_code = 200
+        self.background = None
+        self.init_headers(_SSE_HEADERS)
+
+    async def __call__(self, scope, receive, send) -> None:
+        gen = self.body_iterator
+        status_code = self.status_code
+        raw_headers = self.raw_headers
+
+        async def send_stream() -> None:
+            await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+            async for chunk in gen:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        sender = asyncio.ensure_future(send_stream())
+        disconnected = False
+
+        async def wait_disconnect() -> None:
+            nonlocal disconnected
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            # 客户端已断开：取消发送任务（包括其中正在等待上游数据的生成器）
+            disconnected = True
+            sender.cancel()
+
+        watcher = asyncio.ensure_future(wait_disconnect())
+        try:
+            await sender
+        except asyncio.CancelledError:
+            # 由断开监听取消时正常结束；否则是外部取消，继续向上传播
+            if not disconnected:
+                raise
+        except OSError:
+            # 客户端已断开
+            pass
+        finally:
+            watcher.cancel()
+            await gen.aclose()
+
+
 # 创建 FastAPI 应用
 app = FastAPI(
     title="iflow2api",
@@ -663,21 +772,79 @@ app = FastAPI(
 """,
 version=get_version(),
 lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     redirect_slashes=True,  # 自动处理末尾斜杠
     docs_url="/docs",  # Swagger UI
     redoc_url="/redoc",  # ReDoc
     openapi_url="/openapi.json",  # OpenAPI schema
 )
+# 代理实例在 lifespan 启动时绑定；未配置时为 None，由 get_proxy() 延迟创建
+app.state.proxy = None
 
-# 添加 CORS 中间件（H-05 修复：不再同时使用通配符 origin + credentials）
-# 默认允许所有来源但不携带凭据；如需限制来源请在此列举
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=False,  # RFC 禁止 allow_origins=["*"] + allow_credentials=True
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# ============ CORS 中间件 ============
+
+# H-05 修复：不再同时使用通配符 origin + credentials
+# 默认允许所有来源但不携带凭据（RFC 禁止 "*" 与 credentials 同时使用）
+_CORS_ALLOW_ORIGIN = (b"access-control-allow-origin", b"*")
+_CORS_PREFLIGHT_HEADERS = [
+    _CORS_ALLOW_ORIGIN,
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", b"2"),
+]
+
+
+class WildcardCORSMiddleware:
+    """允许所有来源的 CORS 中间件
+
+    纯 ASGI 实现，等价于 CORSMiddleware(allow_origins=["*"], allow_methods=["*"],
+    allow_headers=["*"], allow_credentials=False)，但响应头预先编码，
+    不为每个请求构造 Headers 对象或重新拼接允许列表。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        has_origin = False
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                has_origin = True
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        # 非跨域请求直接透传
+        if not has_origin:
+            await self.app(scope, receive, send)
+            return
+
+        # 预检请求：直接应答，允许的请求头原样回显（"*" 不覆盖 Authorization）
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = _CORS_PREFLIGHT_HEADERS
+            if request_headers:
+                headers = headers + [(b"access-control-allow-headers", request_headers)]
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"OK"})
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), _CORS_ALLOW_ORIGIN]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(WildcardCORSMiddleware)
 
 
 # ============ 请求体大小限制中间件 ============
@@ -689,13 +856,35 @@ async def limit_request_body(request: Request, call_next):
     """拒绝超大请求体，防止内存耗尽 DoS（H-07 修复）"""
     content_length = request.headers.get("content-length")
     if content_length and int(content_length) > _MAX_REQUEST_BODY_SIZE:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=413,
             content={"error": {"message": "Request body too large", "type": "invalid_request_error"}},
         )
     return await call_next(request)
 
 
+async def _read_body(request: Request) -> bytes | bytearray:
+    """读取请求体
+
+    有 Content-Length 时按声明长度一次性分配缓冲区，逐块写入，
+    省去分块列表与最终 join 的额外拷贝；返回的 bytearray 可直接交给 jsonutil.loads。
+    """
+    content_length = request.headers.get("content-length")
+    if not content_length or not content_length.isdigit():
+        return await request.body()
+
+    buf = bytearray(int(content_length))
+    offset = 0
+    async for chunk in request.stream():
+        end = offset + len(chunk)
+        buf[offset:end] = chunk
+        offset = end
+    if offset != len(buf):
+        # 实际长度与声明不符（客户端提前断开等）
+        del buf[offset:]
+    return buf
+
+
 # ============ 自定义 API 鉴权中间件 ============
 
 # 简单内存缓存，减少每次请求读磁盘（H-08 修复）
@@ -705,15 +894,18 @@ _SETTINGS_CACHE_TTL = 5.0  # 5 秒内复用缓存
 
 def _get_cached_settings():
     """获取缓存的设置，超过 TTL 才重新读盘"""
-    import time as _time
     from .settings import load_settings
-    now = _time.monotonic()
+    now = time.monotonic()
     if _settings_cache["data"] is None or now - _settings_cache["ts"] > _SETTINGS_CACHE_TTL:
         _settings_cache["data"] = load_settings()
         _settings_cache["ts"] = now
     return _settings_cache["data"]
 
 
+# 无需鉴权的路由前缀（str.startswith 直接接受元组）
+_AUTH_SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/admin")
+
+
 @app.middleware("http")
 async def custom_auth_middleware(request: Request, call_next):
     """自定义 API 鉴权中间件
@@ -722,8 +914,7 @@ async def custom_auth_middleware(request: Request, call_next):
     支持 "Bearer {key}" 和 "{key}" 两种格式
     """
     # 跳过健康检查、文档等路由
-    skip_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/admin"]
-    if any(request.url.path.startswith(path) for path in skip_paths):
+    if request.url.path.startswith(_AUTH_SKIP_PATHS):
         return await call_next(request)
 
     # 使用缓存的设置，避免每次请求读磁盘（H-08 修复）
@@ -739,7 +930,7 @@ async def custom_auth_middleware(request: Request, call_next):
     
     # 验证授权信息
     if not auth_value:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=401,
             content={
                 "error": {
@@ -756,9 +947,8 @@ async def custom_auth_middleware(request: Request, call_next):
         actual_key = auth_value[7:]  # 移除 "Bearer " 前缀
     
     # 验证 key（使用常数时间比较防止时序攻击）
-    import hmac as _hmac
-    if not _hmac.compare_digest(actual_key, settings.custom_api_key):
-        return JSONResponse(
+    if not hmac.compare_digest(actual_key, settings.custom_api_key):
+        return FastJSONResponse(
             status_code=401,
             content={
                 "error": {
@@ -776,18 +966,16 @@ async def custom_auth_middleware(request: Request, call_next):
 # ============ 管理界面 ============
 
 # 挂载静态文件目录
-import os as _os
-_admin_static_dir = _os.path.join(_os.path.dirname(__file__), "admin", "static")
-if _os.path.exists(_admin_static_dir):
+_admin_static_dir = os.path.join(os.path.dirname(__file__), "admin", "static")
+if os.path.exists(_admin_static_dir):
     app.mount("/admin/static", StaticFiles(directory=_admin_static_dir), name="admin_static")
 
 
 @app.get("/admin", response_class=HTMLResponse, tags=["Admin"])
-@app.get("/admin/", response_class=HTMLResponse, tags=["Admin"])
 async def admin_page():
     """管理界面入口"""
-    index_path = _os.path.join(_admin_static_dir, "index.html")
-    if _os.path.exists(index_path):
+    index_path = os.path.join(_admin_static_dir, "index.html")
+    if os.path.exists(index_path):
         with open(index_path, "r", encoding="utf-8") as f:
             return f.read()
     return HTMLResponse(content="<h1>管理界面未找到</h1>", status_code=404)
@@ -801,47 +989,88 @@ except ImportError as e:
     logger.warning("无法加载管理界面路由: %s", e)
 
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """记录请求信息，包括请求体大小和响应时间"""
-    start_time = time.time()
-    
-    # 获取请求体大小（仅对 POST/PUT/PATCH 请求）
-    body_size = 0
-    if request.method in ("POST", "PUT", "PATCH"):
-        content_length = request.headers.get("content-length")
-        if content_length:
-            body_size = int(content_length)
-    
-    # 格式化请求体大小
-    def format_size(size: int) -> str:
-        if size < 1024:
-            return f"{size}B"
-        elif size < 1024 * 1024:
-            return f"{size/1024:.1f}KB"
-        else:
-            return f"{size/1024/1024:.1f}MB"
-    
-    logger.info("Request: %s %s%s", request.method, request.url.path,
-                 f" ({format_size(body_size)})" if body_size > 0 else "")
-    
-    if request.method == "OPTIONS":
-        # 显式处理 OPTIONS 请求以确保 CORS 正常
-        response = await call_next(request)
-        return response
-    
-    response = await call_next(request)
-    
-    # 计算响应时间
-    elapsed_ms = (time.time() - start_time) * 1000
-    logger.info("Response: %d (%.0fms)", response.status_code, elapsed_ms)
-    
-    # 如果返回 405，打印更多调试信息
-    if response.status_code == 405:
-        logger.debug("路径 %s 不支持 %s 方法", request.url.path, request.method)
-        logger.debug("当前已注册的 POST 路由包括: /v1/chat/completions, /v1/messages, / 等")
-        
-    return response
+def _format_size(size: int) -> str:
+    """格式化请求体大小"""
+    if size < 1024:
+        return f"{size}B"
+    elif size < 1024 * 1024:
+        return f"{size/1024:.1f}KB"
+    else:
+        return f"{size/1024/1024:.1f}MB"
+
+
+class LogMiddleware:
+    """记录请求信息，包括请求体大小和响应时间
+
+    纯 ASGI 实现，避免 BaseHTTPMiddleware 每个请求额外创建任务组、内存流等对象。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # INFO 日志未启用时直接透传，不做任何字段提取
+        if scope["type"] != "http" or not logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+
+        # 获取请求体大小（仅对 POST/PUT/PATCH 请求）
+        body_size = 0
+        if method in ("POST", "PUT", "PATCH"):
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    try:
+                        body_size = int(value)
+                    except ValueError:
+                        pass
+                    break
+
+        logger.info("Request: %s %s%s", method, path,
+                     f" ({_format_size(body_size)})" if body_size > 0 else "")
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # 计算响应时间
+                elapsed_ms = (time.perf_counter() - start_time) * 1000
+                logger.info("Response: %d (%.0fms)", status, elapsed_ms)
+
+                # 如果返回 405，打印更多调试信息
+                if status == 405:
+                    logger.debug("路径 %s 不支持 %s 方法", path, method)
+                    logger.debug("当前已注册的 POST 路由包括: /v1/chat/completions, /v1/messages, / 等")
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+app.add_middleware(LogMiddleware)
+
+
+class TrailingSlashMiddleware:
+    """去除请求路径末尾的斜杠（根路径除外）
+
+    路由只注册不带斜杠的版本，"/v1/chat/completions/" 等请求在路由前统一改写，
+    既缩短了路由表，也不会触发 redirect_slashes 的 307 重定向。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if len(path) > 1 and path.endswith("/"):
+                scope = dict(scope)
+                scope["path"] = path.rstrip("/") or "/"
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(TrailingSlashMiddleware)
 
 
 # ============ 请求/响应模型 ============
@@ -901,6 +1130,51 @@ ANTHROPIC_MESSAGES_EXAMPLE = {
 
 # ============ API 端点 ============
 
+# 根路径响应内容固定，导入时预先序列化
+_ROOT_BODY = jsonutil.dumps({
+    "service": "iflow2api",
+    "version": get_version(),
+    "description": "iFlow CLI AI 服务 → OpenAI 兼容 API",
+    "endpoints": {
+        "models": "/v1/models",
+        "chat_completions": "/v1/chat/completions",
+        "messages": "/v1/messages",
+        "health": "/health",
+        "docs": "/docs",
+        "redoc": "/redoc",
+    },
+})
+
+# 健康检查响应缓存：诊断信息在进程内不变，只有登录状态会变化，
+# 首次请求时按登录状态分别序列化一次（诊断信息需要读取系统文件，不在导入时计算）
+_health_bodies: dict[bool, bytes] = {}
+
+
+def _get_health_body(is_logged_in: bool) -> bytes:
+    """获取预序列化的健康检查响应"""
+    body = _health_bodies.get(is_logged_in)
+    if body is None:
+        diagnostic = get_diagnostic_info()
+        body = _health_bodies[is_logged_in] = jsonutil.dumps({
+            "status": "healthy" if is_logged_in else "degraded",
+            "iflow_logged_in": is_logged_in,
+            "version": diagnostic["version"],
+            "os": diagnostic["os"],
+            "platform": diagnostic["platform"]["system"],
+            "architecture": diagnostic["platform"]["architecture"],
+            "python": diagnostic["platform"]["python_version"],
+            "runtime": diagnostic["runtime"],
+            "docker": diagnostic["docker"],
+            "kubernetes": diagnostic["kubernetes"],
+            "wsl": diagnostic["wsl"],
+        })
+    return body
+
+
+# 模型列表缓存：列表为静态内容，60 秒内复用序列化结果
+_models_cache: dict = {"body": None, "ts": 0.0}
+_MODELS_CACHE_TTL = 60.0
+
 @app.get(
     "/",
     summary="根路径",
@@ -910,19 +1184,7 @@ ANTHROPIC_MESSAGES_EXAMPLE = {
 )
 async def root():
     """根路径"""
-    return {
-        "service": "iflow2api",
-        "version": get_version(),
-        "description": "iFlow CLI AI 服务 → OpenAI 兼容 API",
-        "endpoints": {
-            "models": "/v1/models",
-            "chat_completions": "/v1/chat/completions",
-            "messages": "/v1/messages",
-            "health": "/health",
-            "docs": "/docs",
-            "redoc": "/redoc",
-        },
-    }
+    return Response(_ROOT_BODY, media_type="application/json")
 
 
 @app.get(
@@ -934,21 +1196,7 @@ async def root():
 )
 async def health():
     """健康检查"""
-    is_logged_in = check_iflow_login()
-    diagnostic = get_diagnostic_info()
-    return {
-        "status": "healthy" if is_logged_in else "degraded",
-        "iflow_logged_in": is_logged_in,
-        "version": diagnostic["version"],
-        "os": diagnostic["os"],
-        "platform": diagnostic["platform"]["system"],
-        "architecture": diagnostic["platform"]["architecture"],
-        "python": diagnostic["platform"]["python_version"],
-        "runtime": diagnostic["runtime"],
-        "docker": diagnostic["docker"],
-        "kubernetes": diagnostic["kubernetes"],
-        "wsl": diagnostic["wsl"],
-    }
+    return Response(_get_health_body(check_iflow_login()), media_type="application/json")
 
 
 @app.get(
@@ -958,11 +1206,18 @@ async def health():
     response_description="模型列表",
     tags=["模型"],
 )
-async def list_models():
+@app.get("/models")
+async def list_models(request: Request):
     """获取可用模型列表"""
     try:
-        proxy = get_proxy()
-        return await proxy.get_models()
+        proxy = request.app.state.proxy or get_proxy()
+        now = time.monotonic()
+        body = _models_cache["body"]
+        if body is None or now - _models_cache["ts"] > _MODELS_CACHE_TTL:
+            body = jsonutil.dumps(await proxy.get_models())
+            _models_cache["body"] = body
+            _models_cache["ts"] = now
+        return Response(body, media_type="application/json")
     except IFlowNotConfiguredError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
@@ -994,9 +1249,9 @@ async def list_vision_models():
     }
 
 
-def create_error_response(status_code: int, message: str, error_type: str = "api_error") -> JSONResponse:
+def create_error_response(status_code: int, message: str, error_type: str = "api_error") -> FastJSONResponse:
     """创建 OpenAI 兼容的错误响应"""
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={
             "error": {
@@ -1009,6 +1264,18 @@ def create_error_response(status_code: int, message: str, error_type: str = "api
     )
 
 
+def _upstream_error_message(e: Exception) -> str:
+    """提取上游错误响应中的 msg 字段，无法解析时使用异常信息"""
+    error_msg = str(e)
+    resp = getattr(e, "response", None)
+    if resp is not None:
+        try:
+            error_msg = resp.json().get("msg", error_msg)
+        except Exception:
+            pass
+    return error_msg
+
+
 @app.post(
     "/v1/chat/completions",
     summary="Chat Completions API (OpenAI 格式)",
@@ -1100,29 +1367,26 @@ OpenAI 兼容的 Chat Completions API 端点。
         }
     },
 )
-@app.post("/v1/chat/completions/")
 @app.post("/chat/completions")
-@app.post("/chat/completions/")
 @app.post("/api/v1/chat/completions")
-@app.post("/api/v1/chat/completions/")
 async def chat_completions_openai(request: Request):
     """Chat Completions API - OpenAI 格式"""
     try:
-        proxy = get_proxy()
+        proxy = request.app.state.proxy or get_proxy()
     except IFlowNotConfiguredError as e:
         return create_error_response(503, str(e), "iflow_not_configured")
     
     try:
-        body_bytes = await request.body()
-        body = json.loads(body_bytes.decode("utf-8"))
+        body_bytes = await _read_body(request)
+        body = jsonutil.loads(body_bytes)
         if "messages" not in body:
             return create_error_response(422, "Field 'messages' is required", "invalid_request_error")
         stream = body.get("stream", False)
         model = body.get("model", "unknown")
-        msg_count = len(body.get("messages", []))
-        has_tools = "tools" in body
-        logger.info("Chat请求: model=%s, stream=%s, messages=%d, has_tools=%s",
-                     model, stream, msg_count, has_tools)
+        # 仅在 INFO 日志启用时才提取日志字段
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Chat请求: model=%s, stream=%s, messages=%d, has_tools=%s",
+                         model, stream, len(body["messages"]), "tools" in body)
 
         if stream:
             # 流式响应 - 整个流式传输过程都在锁内进行
@@ -1134,28 +1398,36 @@ async def chat_completions_openai(request: Request):
                         stream_gen = await proxy.chat_completions(body, stream=True)
                         chunk_count = 0
                         try:
-                            async for chunk in stream_gen:
+                            # 仅前 3 个 chunk 输出调试日志，之后的主循环不再做任何判断
+                            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                            while chunk_count < 3:
+                                chunk = await anext(stream_gen, None)
+                                if chunk is None:
+                                    break
                                 chunk_count += 1
-                                if chunk_count <= 3:
+                                if debug_enabled:
                                     logger.debug("流式chunk[%d]: %s", chunk_count, chunk[:200])
                                 yield chunk
+                            async for chunk in stream_gen:
+                                chunk_count += 1
+                                yield chunk
                         except Exception as e:
                             # 传输过程中的错误
                             logger.error("Streaming error after %d chunks: %s", chunk_count, e)
                         else:
                             # 正常结束：确保发送 [DONE] 标记（上游不一定发送）
                             if chunk_count > 0:
-                                yield b"data: [DONE]\n\n"
+                                yield SSE_DONE_FRAME
                         finally:
                             logger.debug("流式完成: 共 %d chunks", chunk_count)
                             if chunk_count == 0:
                                 # 上游返回了空的流式响应，生成一个错误回退
                                 logger.warning("生成错误回退响应 (0 chunks from upstream)")
-                                import time as _time
+                                now = int(time.time())
                                 fallback = {
-                                    "id": f"fallback-{int(_time.time())}",
+                                    "id": f"fallback-{now}",
                                     "object": "chat.completion.chunk",
-                                    "created": int(_time.time()),
+                                    "created": now,
                                     "model": model,
                                     "choices": [{
                                         "index": 0,
@@ -1163,28 +1435,12 @@ async def chat_completions_openai(request: Request):
                                         "finish_reason": "stop"
                                     }]
                                 }
-                                yield ("data: " + json.dumps(fallback, ensure_ascii=False) + "\n\n").encode("utf-8")
-                                yield b"data: [DONE]\n\n"
+                                yield SSE_DATA_PREFIX + jsonutil.dumps(fallback) + SSE_FRAME_END
+                                yield SSE_DONE_FRAME
                 
-                return StreamingResponse(
-                    generate_with_lock(),
-                    media_type="text/event-stream",
-                    headers={
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive",
-                        "X-Accel-Buffering": "no",
-                    },
-                )
+                return SSEStreamResponse(generate_with_lock())
             except Exception as e:
-                error_msg = str(e)
-                resp = getattr(e, "response", None)
-                if resp is not None:
-                    try:
-                        error_data = resp.json()
-                        error_msg = error_data.get("msg", error_msg)
-                    except Exception:
-                        pass
-                return create_error_response(500, error_msg)
+                return create_error_response(500, _upstream_error_message(e))
         else:
             # 使用锁确保同一时间只有一个上游请求
             async with _api_request_lock:
@@ -1205,22 +1461,13 @@ async def chat_completions_openai(request: Request):
                          '有' if reasoning else '无',
                          '有' if tool_calls else '无')
             
-            return JSONResponse(content=result)
+            return FastJSONResponse(content=result)
 
-    except json.JSONDecodeError as e:
+    except jsonutil.JSONDecodeError as e:
         return create_error_response(400, f"Invalid JSON: {e}", "invalid_request_error")
     except Exception as e:
-        error_msg = str(e)
-        status_code = 500
-        resp = getattr(e, "response", None)
-        if resp is not None:
-            try:
-                status_code = resp.status_code
-                error_data = resp.json()
-                error_msg = error_data.get("msg", error_msg)
-            except Exception:
-                pass
-        return create_error_response(status_code, error_msg)
+        status_code = getattr(getattr(e, "response", None), "status_code", 500)
+        return create_error_response(status_code, _upstream_error_message(e))
 
 
 @app.post(
@@ -1339,18 +1586,15 @@ Anthropic 兼容的 Messages API 端点，支持 Claude Code 等客户端。
         }
     },
 )
-@app.post("/v1/messages/")
 @app.post("/messages")
-@app.post("/messages/")
 @app.post("/api/v1/messages")
-@app.post("/api/v1/messages/")
 async def messages_anthropic(request: Request):
     """Messages API - Anthropic 格式（Claude Code 兼容）"""
     try:
-        body_bytes = await request.body()
-        body = json.loads(body_bytes.decode("utf-8"))
+        body_bytes = await _read_body(request)
+        body = jsonutil.loads(body_bytes)
         if "messages" not in body:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=422,
                 content={"type": "error", "error": {"type": "invalid_request_error", "message": "Field 'messages' is required"}}
             )
@@ -1365,9 +1609,9 @@ async def messages_anthropic(request: Request):
                      original_model, mapped_model, stream)
 
         try:
-            proxy = get_proxy()
+            proxy = request.app.state.proxy or get_proxy()
         except IFlowNotConfiguredError as e:
-            return JSONResponse(
+            return FastJSONResponse(
                 status_code=503,
                 content={"type": "error", "error": {"type": "iflow_not_configured", "message": str(e)}}
             )
@@ -1387,10 +1631,10 @@ async def messages_anthropic(request: Request):
                     stream_gen = await proxy.chat_completions(openai_body, stream=True)
 
                     # 发送 message_start
-                    yield create_anthropic_stream_message_start(mapped_model).encode('utf-8')
+                    yield create_anthropic_stream_message_start(mapped_model)
 
-                    output_tokens = 0
-                    buffer = ""
+                    output_chars = 0  # 累计输出字符数，结束时统一换算 token
+                    buffer = bytearray()
                     block_index = 0
                     stop_reason = "end_turn"
 
@@ -1404,7 +1648,7 @@ async def messages_anthropic(request: Request):
 
                     async def _process_parsed_chunk(parsed: dict):
                         """处理单个已解析的 SSE chunk，yield Anthropic 事件"""
-                        nonlocal block_index, output_tokens, stop_reason
+                        nonlocal block_index, output_chars, stop_reason
                         nonlocal current_text_block_type, current_text_block_index
                         nonlocal current_tc_index
 
@@ -1420,14 +1664,14 @@ async def messages_anthropic(request: Request):
                         if content and content_type:
                             if current_text_block_type != content_type:
                                 if current_text_block_type is not None:
-                                    yield create_anthropic_content_block_stop(current_text_block_index).encode('utf-8')
+                                    yield create_anthropic_content_block_stop(current_text_block_index)
                                 current_text_block_index = block_index
                                 block_index += 1
-                                yield create_anthropic_content_block_start(current_text_block_index, content_type).encode('utf-8')
+                                yield create_anthropic_content_block_start(current_text_block_index, content_type)
                                 current_text_block_type = content_type
-                            output_tokens += len(content) // 4
+                            output_chars += len(content)
                             delta_type = "thinking_delta" if content_type == "thinking" else "text_delta"
-                            yield create_anthropic_content_block_delta(content, current_text_block_index, delta_type).encode('utf-8')
+                            yield create_anthropic_content_block_delta(content, current_text_block_index, delta_type)
 
                         # ---- 工具调用 ----
                         tool_calls_delta = delta.get("tool_calls", [])
@@ -1441,19 +1685,19 @@ async def messages_anthropic(request: Request):
                             if tc_index not in tool_call_block_map:
                                 # 关闭文本块（如果有）
                                 if current_text_block_type is not None:
-                                    yield create_anthropic_content_block_stop(current_text_block_index).encode('utf-8')
+                                    yield create_anthropic_content_block_stop(current_text_block_index)
                                     current_text_block_type = None
                                 # 关闭上一个工具调用块（如果有）
                                 if current_tc_index >= 0 and current_tc_index in tool_call_block_map:
                                     yield create_anthropic_content_block_stop(
                                         tool_call_block_map[current_tc_index]["block_index"]
-                                    ).encode('utf-8')
+                                    )
                                 # 开始新工具调用块
                                 tc_block_index = block_index
                                 block_index += 1
                                 tool_call_block_map[tc_index] = {
                                     "block_index": tc_block_index,
-                                    "id": tc_id or f"toolu_{uuid.uuid4().hex[:24]}",
+                                    "id": tc_id or "toolu_" + os.urandom(12).hex(),
                                     "name": tc_name or "",
                                 }
                                 current_tc_index = tc_index
@@ -1461,13 +1705,13 @@ async def messages_anthropic(request: Request):
                                     tc_block_index,
                                     tool_call_block_map[tc_index]["id"],
                                     tool_call_block_map[tc_index]["name"],
-                                ).encode('utf-8')
+                                )
 
                             # 流式传输参数片段
                             if tc_args:
                                 yield create_anthropic_input_json_delta(
                                     tc_args, tool_call_block_map[tc_index]["block_index"]
-                                ).encode('utf-8')
+                                )
 
                         # ---- finish_reason ----
                         if finish_reason == "tool_calls":
@@ -1478,21 +1722,27 @@ async def messages_anthropic(request: Request):
                             stop_reason = "max_tokens"
 
                     async for chunk in stream_gen:
-                        if isinstance(chunk, str):
-                            chunk_str = chunk
-                        else:
-                            chunk_str = bytes(chunk).decode('utf-8')
-                        buffer += chunk_str
-
-                        while "\n" in buffer:
-                            line, buffer = buffer.split("\n", 1)
-                            parsed = parse_openai_sse_chunk(line)
+                        # IFlowProxy.chat_completions(stream=True) 约定只产出 bytes
+                        buffer.extend(chunk)
+
+                        # 原地消费已完整的行，避免每次切分都复制剩余 buffer
+                        events = []
+                        start = 0
+                        while (idx := buffer.find(b"\n", start)) != -1:
+                            parsed = parse_openai_sse_chunk(buffer[start:idx])
+                            start = idx + 1
                             if parsed:
                                 async for evt in _process_parsed_chunk(parsed):
-                                    yield evt
+                                    events.append(evt)
+                        if start:
+                            del buffer[:start]
+
+                        # 同一上游 chunk 内产生的事件合并为一次发送，减少 ASGI send 次数且不增加延迟
+                        if events:
+                            yield b"".join(events)
 
                     # 处理剩余 buffer
-                    for line in buffer.split("\n"):
+                    for line in buffer.split(b"\n"):
                         if line.strip():
                             parsed = parse_openai_sse_chunk(line)
                             if parsed:
@@ -1501,52 +1751,38 @@ async def messages_anthropic(request: Request):
 
                     # 关闭最后打开的文本块
                     if current_text_block_type is not None:
-                        yield create_anthropic_content_block_stop(current_text_block_index).encode('utf-8')
+                        yield create_anthropic_content_block_stop(current_text_block_index)
 
                     # 关闭最后打开的工具调用块
                     if current_tc_index >= 0 and current_tc_index in tool_call_block_map:
                         yield create_anthropic_content_block_stop(
                             tool_call_block_map[current_tc_index]["block_index"]
-                        ).encode('utf-8')
+                        )
 
                     # 发送结束事件
-                    yield create_anthropic_message_delta(stop_reason, output_tokens).encode('utf-8')
-                    yield create_anthropic_message_stop().encode('utf-8')
-
-            return StreamingResponse(
-                generate_anthropic_stream_with_lock(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no",
-                },
-            )
+                    yield create_anthropic_message_delta(stop_reason, output_chars // 4)
+                    yield create_anthropic_message_stop()
+
+            return SSEStreamResponse(generate_anthropic_stream_with_lock())
         else:
             # 非流式响应 - 转换为 Anthropic 格式
             # 使用锁确保同一时间只有一个上游请求
             async with _api_request_lock:
                 logger.debug("获取上游非流式响应 (Anthropic)...")
                 openai_result = await proxy.chat_completions(openai_body, stream=False)
-            logger.debug("收到 OpenAI 格式响应: %s", json.dumps(openai_result, ensure_ascii=False)[:300])
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("收到 OpenAI 格式响应: %s", json.dumps(openai_result, ensure_ascii=False)[:300])
             anthropic_result = openai_to_anthropic_response(openai_result, mapped_model)
             first_block = anthropic_result['content'][0] if anthropic_result['content'] else {}
             first_preview = first_block.get('text') or first_block.get('name') or ''
             logger.debug("Anthropic 格式响应: id=%s, stop_reason=%s, preview=%s",
                          anthropic_result['id'], anthropic_result['stop_reason'], first_preview[:80])
-            return JSONResponse(content=anthropic_result)
+            return FastJSONResponse(content=anthropic_result)
 
-    except json.JSONDecodeError as e:
+    except jsonutil.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
     except Exception as e:
-        error_msg = str(e)
-        resp = getattr(e, "response", None)
-        if resp is not None:
-            try:
-                error_data = resp.json()
-                error_msg = error_data.get("msg", error_msg)
-            except Exception:
-                pass
+        error_msg = _upstream_error_message(e)
         # Anthropic 格式的错误响应
         error_response = {
             "type": "error",
@@ -1555,21 +1791,21 @@ async def messages_anthropic(request: Request):
                 "message": error_msg
             }
         }
-        return JSONResponse(content=error_response, status_code=500)
+        return FastJSONResponse(content=error_response, status_code=500)
 
 
 @app.post("/")
-@app.post("/v1/")
+@app.post("/v1")
 async def root_post(request: Request):
     """根路径 POST - 尝试自动检测格式"""
     try:
-        proxy = get_proxy()
+        proxy = request.app.state.proxy or get_proxy()
     except IFlowNotConfiguredError as e:
         return create_error_response(503, str(e), "iflow_not_configured")
     
     try:
-        body_bytes = await request.body()
-        body = json.loads(body_bytes.decode("utf-8"))
+        body_bytes = await _read_body(request)
+        body = jsonutil.loads(body_bytes)
         
         # 简单启发式：如果请求中没有 choices 相关字段，默认使用 Anthropic 格式
         # 因为 CCR 主要使用 Anthropic 格式
@@ -1592,11 +1828,7 @@ async def root_post(request: Request):
                     finally:
                         logger.debug("流式完成 (root_post): 共 %d chunks", chunk_count)
             
-            return StreamingResponse(
-                generate_with_lock(),
-                media_type="text/event-stream",
-                headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
-            )
+            return SSEStreamResponse(generate_with_lock())
         else:
             # 使用锁确保同一时间只有一个上游请求
             async with _api_request_lock:
@@ -1606,17 +1838,11 @@ async def root_post(request: Request):
             if not result.get("choices"):
                 logger.error("API 响应缺少 choices 数组 (root_post): %s", json.dumps(result, ensure_ascii=False)[:500])
                 raise HTTPException(status_code=500, detail="API 响应格式错误: 缺少 choices 数组")
-            return JSONResponse(content=result)
+            return FastJSONResponse(content=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/models")
-async def list_models_compat():
-    """Models API - 兼容不带 /v1 前缀的请求"""
-    return await list_models()
-
-
 # ============ Anthropic SDK 兼容端点 ============
 
 @app.post(
@@ -1650,41 +1876,53 @@ async def count_tokens(request: Request):
     由于我们无法精确计算上游模型的 token 数，
     返回一个估算值。
     """
+    body_bytes = await _read_body(request)
     try:
-        body_bytes = await request.body()
-        body = json.loads(body_bytes.decode("utf-8"))
-        
-        # 简单估算：计算消息文本的字符数，除以 4 得到大致的 token 数
-        messages = body.get("messages", [])
-        system = body.get("system", "")
-        
-        total_chars = len(str(system))
-        for msg in messages:
-            content = msg.get("content", "")
-            if isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict) and block.get("type") == "text":
-                        total_chars += len(block.get("text", ""))
-            else:
-                total_chars += len(str(content))
-        
-        # L-06: 语言感知 token 估算：中文约 1.5 字/token，英文约 4 字/token
-        cjk_chars = sum(1 for c in str(system) + "".join(
-            (block.get("text", "") if isinstance(block, dict) and block.get("type") == "text" else str(msg.get("content", "")) if not isinstance(msg.get("content"), list) else "")
-            for msg in messages
-            for block in (msg.get("content") if isinstance(msg.get("content"), list) else [msg])
-        ) if '\u4e00' <= c <= '\u9fff')
-        ascii_chars = total_chars - cjk_chars
-        estimated_tokens = max(1, int(cjk_chars / 1.5 + ascii_chars / 4.0))
-        
-        return {
-            "input_tokens": estimated_tokens
-        }
-    except Exception as e:
-        # 出错时返回一个默认值
-        logger.warning("count_tokens 错误: %s", e)
+        body = jsonutil.loads(body_bytes)
+    except (jsonutil.JSONDecodeError, UnicodeDecodeError) as e:
+        # 请求体无法解析时返回一个默认值
+        logger.warning("count_tokens 请求体解析失败: %s", e)
+        return {"input_tokens": 100}
+    if not isinstance(body, dict):
         return {"input_tokens": 100}
 
+    messages = body.get("messages") or []
+    if not isinstance(messages, list):
+        raise HTTPException(status_code=400, detail="messages must be a list")
+
+    # 简单估算：收集消息文本，按字符数估算 token 数
+    # system 与 content 可以是字符串或内容块列表，其他类型忽略
+    texts: list[str] = []
+
+    def collect(value: Any) -> None:
+        if isinstance(value, str):
+            texts.append(value)
+        elif isinstance(value, list):
+            for block in value:
+                if isinstance(block, dict) and block.get("type") == "text":
+                    text = block.get("text", "")
+                    if isinstance(text, str):
+                        texts.append(text)
+
+    collect(body.get("system"))
+    for msg in messages:
+        if isinstance(msg, dict):
+            collect(msg.get("content"))
+    full_text = "".join(texts)
+
+    # L-06: 语言感知 token 估算：中文约 1.5 字/token，英文约 4 字/token
+    total_chars = len(full_text)
+    if full_text.isascii():
+        cjk_chars = 0
+    else:
+        cjk_chars = sum(1 for c in full_text if '\u4e00' <= c <= '\u9fff')
+    ascii_chars = total_chars - cjk_chars
+    estimated_tokens = max(1, int(cjk_chars / 1.5 + ascii_chars / 4.0))
+
+    return {
+        "input_tokens": estimated_tokens
+    }
+
 
 def main():
     """主入口"""
@@ -1706,6 +1944,7 @@ def main():
   iflow2api                    # 使用默认配置启动
   iflow2api --port 28001       # 指定端口
   iflow2api --host 0.0.0.0     # 监听所有网卡
+  iflow2api --workers 4        # 多进程模式（也可用环境变量 IFLOW2API_WORKERS）
   iflow2api --version          # 显示版本信息
 
 配置文件位置:
@@ -1717,6 +1956,8 @@ def main():
     )
     parser.add_argument('--host', default=None, help='监听地址 (默认: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=None, help='监听端口 (默认: 28000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='工作进程数 (默认: 1，或环境变量 IFLOW2API_WORKERS)')
     parser.add_argument('--version', action='store_true', help='显示版本信息')
     args = parser.parse_args()
 
@@ -1740,22 +1981,35 @@ def main():
     # 命令行参数优先于配置文件
     host = args.host if args.host else settings.host
     port = args.port if args.port else settings.port
+    workers = args.workers or _workers_from_env()
 
     # 打印启动信息
     logger.info("%s", get_startup_info())
     logger.info("  监听地址: %s:%d", host, port)
+    if workers > 1:
+        logger.info("  工作进程: %d", workers)
 
-    # 显示快速入门引导
-    _show_quick_start_guide(port)
+    # 显示快速入门引导（仅交互式终端；systemd/docker 日志中无人阅读，跳过以减少启动输出）
+    if sys.stdout.isatty():
+        _show_quick_start_guide(port)
 
-    # 启动服务 - 直接传入 app 对象而非字符串，避免打包后导入失败
+    # 启动服务 - 单进程直接传入 app 对象而非字符串，避免打包后导入失败；
+    # 多进程模式下 uvicorn 要求使用导入字符串，由各工作进程自行导入
     try:
         uvicorn.run(
-            app,
+            "iflow2api.app:app" if workers > 1 else app,
             host=host,
             port=port,
             reload=False,
             log_config=None,  # 不覆盖我们在 setup_file_logging() 中配置的日志 handler
+            # 优先使用 uvloop + httptools（uvicorn[standard] 已引入；Windows 无 uvloop 时自动回退 asyncio）
+            loop="auto",
+            http="auto",
+            # 长连接流式代理场景调优：限制并发防止 fd 耗尽，加大 backlog 应对突发连接
+            limit_concurrency=settings.limit_concurrency or 1000,
+            backlog=settings.backlog or 4096,
+            timeout_keep_alive=settings.timeout_keep_alive or 75,
+            workers=workers if workers > 1 else None,
         )
     except OSError as e:
         # 端口冲突友好提示
@@ -1766,6 +2020,16 @@ def main():
         raise
 
 
+def _workers_from_env() -> int:
+    """从环境变量 IFLOW2API_WORKERS 读取工作进程数（未设置或无效时为 1）"""
+    value = os.environ.get("IFLOW2API_WORKERS", "")
+    try:
+        return max(1, int(value)) if value else 1
+    except ValueError:
+        logger.warning("IFLOW2API_WORKERS 无效: %r，使用单进程", value)
+        return 1
+
+
 def _show_quick_start_guide(port: int):
     """显示快速入门引导"""
     logger.info("")
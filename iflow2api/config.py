@@ -1,15 +1,32 @@
 """iFlow 配置读取器 - 从 ~/.iflow/settings.json 读取认证信息"""
 
-import json
 import logging
 import os
+import stat
+import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
+from . import jsonutil
+
 logger = logging.getLogger("iflow2api")
 
+# load_iflow_config 解析结果缓存: (缓存键, IFlowConfig)
+# 缓存键由配置文件 mtime、大小及 installation_id 文件状态组成，文件变化即失效
+_config_cache: Optional[tuple[tuple, "IFlowConfig"]] = None
+
+# check_iflow_login 结果缓存: (monotonic 时间戳, 结果)
+# /health 等探针会高频调用，登录状态无需实时精确
+_LOGIN_CHECK_TTL = 5.0
+_login_check_cache: Optional[tuple[float, bool]] = None
+
+# save_iflow_config 是"读取-合并-写回"，token 刷新、OAuth 登录和管理页可能在不同线程同时调用，串行化
+_save_lock = threading.Lock()
+
 
 class IFlowConfig(BaseModel):
     """iFlow 配置"""
@@ -38,18 +55,23 @@ class IFlowConfig(BaseModel):
     )
 
 
+# 配置文件路径在进程生命周期内不变，导入时计算一次
+# Windows: C:\Users\<user>\.iflow\settings.json
+# Linux/Mac: ~/.iflow/settings.json
+IFLOW_CONFIG_PATH = Path.home() / ".iflow" / "settings.json"
+INSTALLATION_ID_PATH = Path.home() / ".iflow" / "installation_id"
+# 应用主配置 ~/.iflow2api/config.json
+APP_CONFIG_PATH = Path.home() / ".iflow2api" / "config.json"
+
+
 def get_iflow_config_path() -> Path:
     """获取 iFlow 配置文件路径"""
-    # Windows: C:\Users\<user>\.iflow\settings.json
-    # Linux/Mac: ~/.iflow/settings.json
-    home = Path.home()
-    return home / ".iflow" / "settings.json"
+    return IFLOW_CONFIG_PATH
 
 
 def get_installation_id_path() -> Path:
     """获取 installation_id 文件路径"""
-    home = Path.home()
-    return home / ".iflow" / "installation_id"
+    return INSTALLATION_ID_PATH
 
 
 def _decrypt_sensitive_fields(data: dict) -> dict:
@@ -80,17 +102,33 @@ def load_iflow_config() -> IFlowConfig:
         FileNotFoundError: 配置文件不存在
         ValueError: 配置文件格式错误或缺少必要字段
     """
+    global _config_cache
+
     config_path = get_iflow_config_path()
 
-    if not config_path.exists():
+    try:
+        st = config_path.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"iFlow 配置文件不存在: {config_path}\n请先运行 iflow 命令并完成登录"
         )
 
+    installation_id_path = get_installation_id_path()
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
+        id_st = installation_id_path.stat()
+        id_key = (id_st.st_mtime_ns, id_st.st_size)
+    except OSError:
+        id_key = None
+
+    # 文件未变化时直接返回缓存（返回副本，避免调用方修改污染缓存）
+    cache_key = (st.st_mtime_ns, st.st_size, id_key)
+    cached = _config_cache
+    if cached is not None and cached[0] == cache_key:
+        return cached[1].model_copy()
+
+    try:
+        data = jsonutil.loads(config_path.read_bytes())
+    except jsonutil.JSONDecodeError as e:
         raise ValueError(f"iFlow 配置文件格式错误: {e}")
 
     # 解密敏感字段（如 oauth_refresh_token）
@@ -120,16 +158,16 @@ def load_iflow_config() -> IFlowConfig:
     # 解析 OAuth token 过期时间
     oauth_expires_at = None
     expires_at_str = data.get("oauth_expires_at")
-    if expires_at_str:
+    # 至少包含完整日期 (YYYY-MM-DD) 的字符串才尝试解析，非字符串/空值直接跳过
+    if isinstance(expires_at_str, str) and len(expires_at_str) >= 10:
         try:
             oauth_expires_at = datetime.fromisoformat(expires_at_str)
-        except (ValueError, TypeError):
+        except ValueError:
             pass
 
     # 尝试读取 installation_id
     installation_id = None
-    installation_id_path = get_installation_id_path()
-    if installation_id_path.exists():
+    if id_key is not None:
         try:
             installation_id = installation_id_path.read_text(encoding="utf-8").strip()
         except Exception:
@@ -138,7 +176,7 @@ def load_iflow_config() -> IFlowConfig:
     # apiKey 过期时间（OAuth 模式下与 oauth_expires_at 相同）
     api_key_expires_at = oauth_expires_at
 
-    return IFlowConfig(
+    config = IFlowConfig(
         api_key=api_key,
         base_url=base_url,
         model_name=model_name,
@@ -150,6 +188,8 @@ def load_iflow_config() -> IFlowConfig:
         oauth_expires_at=oauth_expires_at,
         api_key_expires_at=api_key_expires_at,
     )
+    _config_cache = (cache_key, config)
+    return config.model_copy()
 
 
 def check_iflow_login() -> bool:
@@ -158,15 +198,27 @@ def check_iflow_login() -> bool:
     检查顺序：
     1. 先检查 ~/.iflow2api/config.json（应用主配置）
     2. 再检查 ~/.iflow/settings.json（iFlow CLI 配置）
+
+    结果缓存 _LOGIN_CHECK_TTL 秒。
     """
+    global _login_check_cache
+
+    now = time.monotonic()
+    cached = _login_check_cache
+    if cached is not None and now - cached[0] < _LOGIN_CHECK_TTL:
+        return cached[1]
+
+    result = _check_iflow_login()
+    _login_check_cache = (now, result)
+    return result
+
+
+def _check_iflow_login() -> bool:
+    """实际执行登录状态检查（不走缓存）"""
     # 首先检查应用主配置
-    from pathlib import Path
-    app_config_path = Path.home() / ".iflow2api" / "config.json"
-    if app_config_path.exists():
+    if APP_CONFIG_PATH.exists():
         try:
-            import json
-            with open(app_config_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = jsonutil.loads(APP_CONFIG_PATH.read_bytes())
             if data.get("api_key"):
                 return True
         except Exception:
@@ -193,34 +245,55 @@ def save_iflow_config(config: IFlowConfig) -> None:
     config_dir = config_path.parent
     config_dir.mkdir(parents=True, exist_ok=True)
 
-    # 先读取现有数据，保留未知字段（M-03 修复）
-    existing_data: dict = {}
-    if config_path.exists():
+    with _save_lock:
+        # 先读取现有数据，保留未知字段（M-03 修复）
+        existing_data: dict = {}
         try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-        except (json.JSONDecodeError, OSError):
+            existing_data = jsonutil.loads(config_path.read_bytes())
+        except (jsonutil.JSONDecodeError, OSError):
             existing_data = {}
 
-    # 仅覆盖已知字段
-    existing_data["apiKey"] = config.api_key
-    existing_data["baseUrl"] = config.base_url
-
-    if config.model_name is not None:
-        existing_data["modelName"] = config.model_name
-    if config.cna is not None:
-        existing_data["cna"] = config.cna
-    if config.auth_type is not None:
-        existing_data["selectedAuthType"] = config.auth_type
-    if config.oauth_access_token is not None:
-        existing_data["oauth_access_token"] = config.oauth_access_token
-    if config.oauth_refresh_token is not None:
-        existing_data["oauth_refresh_token"] = config.oauth_refresh_token
-    if config.oauth_expires_at is not None:
-        existing_data["oauth_expires_at"] = config.oauth_expires_at.isoformat()
-    if config.api_key_expires_at is not None:
-        existing_data["api_key_expires_at"] = config.api_key_expires_at.isoformat()
-
-    # 保存到文件
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(existing_data, f, indent=2, ensure_ascii=False)
+        # 仅覆盖已知字段
+        existing_data["apiKey"] = config.api_key
+        existing_data["baseUrl"] = config.base_url
+
+        if config.model_name is not None:
+            existing_data["modelName"] = config.model_name
+        if config.cna is not None:
+            existing_data["cna"] = config.cna
+        if config.auth_type is not None:
+            existing_data["selectedAuthType"] = config.auth_type
+        if config.oauth_access_token is not None:
+            existing_data["oauth_access_token"] = config.oauth_access_token
+        if config.oauth_refresh_token is not None:
+            existing_data["oauth_refresh_token"] = config.oauth_refresh_token
+        if config.oauth_expires_at is not None:
+            existing_data["oauth_expires_at"] = config.oauth_expires_at.isoformat()
+        if config.api_key_expires_at is not None:
+            existing_data["api_key_expires_at"] = config.api_key_expires_at.isoformat()
+
+        # 先写临时文件再原子替换，避免写入中途崩溃导致配置文件被截断；
+        # 临时文件名唯一（mkstemp，权限 600），不会与其他写入者的临时文件互相覆盖
+        fd, tmp_name = tempfile.mkstemp(dir=config_dir, prefix=config_path.name + ".", suffix=".tmp")
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(jsonutil.dumps_pretty(existing_data))
+            try:
+                # 保留原文件权限（可能含 token，用户可能设置了 600）
+                os.chmod(tmp_path, stat.S_IMODE(config_path.stat().st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, config_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        invalidate_config_cache()
+
+
+def invalidate_config_cache() -> None:
+    """清除配置与登录状态缓存（配置文件被写入后调用）"""
+    global _config_cache, _login_check_cache
+    _config_cache = None
+    _login_check_cache = None
@@ -3,9 +3,9 @@
 确保请求体 JSON 字段顺序与 iflow-cli 一致。
 """
 
-import json
 from typing import Any, Dict
 
+from .. import jsonutil
 from .constants import CHAT_BODY_FIELD_ORDER
 
 
@@ -19,20 +19,8 @@ def serialize_chat_body(body: Dict[str, Any]) -> str:
     Returns:
         JSON 字符串，字段按 CHAT_BODY_FIELD_ORDER 顺序排列
     """
-    ordered_body = {}
-
-    # 按顺序添加已知字段
-    for field in CHAT_BODY_FIELD_ORDER:
-        if field in body:
-            ordered_body[field] = body[field]
-
-    # 添加其他字段（如模型特定参数）
-    for key, value in body.items():
-        if key not in ordered_body:
-            ordered_body[key] = value
-
     # 使用紧凑格式，无空格
-    return json.dumps(ordered_body, ensure_ascii=False, separators=(",", ":"))
+    return jsonutil.dumps(order_chat_body(body)).decode("utf-8")
 
 
 def order_chat_body(body: Dict[str, Any]) -> Dict[str, Any]:
@@ -45,16 +33,11 @@ def order_chat_body(body: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         有序的请求体字典
     """
-    ordered_body = {}
-
     # 按顺序添加已知字段
-    for field in CHAT_BODY_FIELD_ORDER:
-        if field in body:
-            ordered_body[field] = body[field]
-
-    # 添加其他字段
-    for key, value in body.items():
-        if key not in ordered_body:
-            ordered_body[key] = value
+    ordered_body = {field: body[field] for field in CHAT_BODY_FIELD_ORDER if field in body}
+
+    # 添加其他字段（如模型特定参数）：update 对已有键只覆盖值、不改变位置，
+    # 其余键按原顺序追加到末尾
+    ordered_body.update(body)
 
     return ordered_body
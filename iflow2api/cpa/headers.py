@@ -19,7 +19,7 @@ def build_chat_headers(
     signature: str,
     timestamp: str,
     traceparent: str,
-    content_length: int,
+    content_length: Optional[int] = None,
 ) -> List[Tuple[str, str]]:
     """
     构建 Chat API 请求头（按 iflow-cli 0.5.13 抓包顺序）。
@@ -32,12 +32,12 @@ def build_chat_headers(
         signature: HMAC-SHA256 签名
         timestamp: 毫秒时间戳
         traceparent: W3C Trace Context
-        content_length: 请求体长度
+        content_length: 请求体长度；为 None 时不输出该头，由 HTTP 客户端按实际请求体计算
 
     Returns:
         List[Tuple[str, str]]: 有序请求头列表，可直接传递给 HTTP 客户端
     """
-    return [
+    headers = [
         ("host", host),
         ("connection", "keep-alive"),
         ("Content-Type", "application/json"),
@@ -52,8 +52,10 @@ def build_chat_headers(
         ("accept-language", "*"),
         ("sec-fetch-mode", "cors"),
         ("accept-encoding", "br, gzip, deflate"),
-        ("content-length", str(content_length)),
     ]
+    if content_length is not None:
+        headers.append(("content-length", str(content_length)))
+    return headers
 
 
 def build_telemetry_headers(
@@ -4,8 +4,9 @@
 """
 
 import hashlib
+import os
 import platform
-import secrets
+from functools import lru_cache
 from urllib.parse import quote
 from typing import Optional
 
@@ -16,6 +17,46 @@ from .constants import (
     MMSTAT_VGIF_URL,
 )
 
+# 平台信息在进程生命周期内不变，导入时计算一次
+# （platform.platform() 需要读取系统信息，逐次调用开销较大）
+_PLATFORM_SYSTEM = platform.system()
+_PLATFORM_SYSTEM_LOWER = _PLATFORM_SYSTEM.lower()
+_PLATFORM_MACHINE = platform.machine().lower()
+_PLATFORM_FULL = platform.platform()
+
+# 简化的平台标识
+if _PLATFORM_SYSTEM_LOWER.startswith("win"):
+    _OS_SHORT = "win"
+elif _PLATFORM_SYSTEM_LOWER == "darwin":
+    _OS_SHORT = "mac"
+else:
+    _OS_SHORT = _PLATFORM_SYSTEM_LOWER
+
+# run_error 事件末尾的环境参数（与 iflow-cli 一致，osVersion 不做编码）
+_ERROR_ENV_SUFFIX = (
+    f"&cliVer={IFLOW_CLI_VERSION}"
+    f"&platform={_PLATFORM_SYSTEM_LOWER}"
+    f"&arch={_PLATFORM_MACHINE}"
+    f"&nodeVersion={NODE_VERSION_EMULATED}"
+    f"&osVersion={_PLATFORM_FULL}"
+)
+
+# v.gif 埋点中的固定片段
+_VGIF_MIDDLE = "&spm-cnt=a2110qe.33796382.46182003.0.0&aplus&pid=iflow&_user_id="
+_VGIF_SUFFIX = (
+    "&sidx=aplusSidex"
+    "&ckx=aplusCkx"
+    "&platformType=pc"
+    f"&device_model={_PLATFORM_SYSTEM}"
+    f"&os={_PLATFORM_SYSTEM}"
+    f"&o={_OS_SHORT}"
+    f"&node_version={NODE_VERSION_EMULATED}"
+    "&language=zh_CN.UTF-8"
+    "&interactive=0"
+    "&iFlowEnv="
+    "&_g_encode=utf-8"
+)
+
 
 def generate_observation_id() -> str:
     """
@@ -24,14 +65,17 @@ def generate_observation_id() -> str:
     Returns:
         16 位十六进制字符串
     """
-    return secrets.token_hex(8)
+    # 遥测标识无需 secrets 的封装，直接取系统随机数
+    return os.urandom(8).hex()
 
 
+@lru_cache(maxsize=16)
 def generate_user_id_from_api_key(api_key: str) -> str:
     """
     从 API Key 生成用户 ID。
 
-    使用 MD5 生成确定性 UUID 格式的用户 ID。
+    使用 MD5 生成确定性 UUID 格式的用户 ID（仅作标识，非安全用途）。
+    结果按 api_key 缓存，代理实例重建时无需重复计算。
 
     Args:
         api_key: API 密钥
@@ -40,7 +84,7 @@ def generate_user_id_from_api_key(api_key: str) -> str:
         UUID 格式的用户 ID
     """
     # 使用 MD5 生成 32 位十六进制
-    hash_value = hashlib.md5(api_key.encode()).hexdigest()
+    hash_value = hashlib.md5(api_key.encode(), usedforsecurity=False).hexdigest()
 
     # 格式化为 UUID 格式
     return f"{hash_value[:8]}-{hash_value[8:12]}-{hash_value[12:16]}-{hash_value[16:20]}-{hash_value[20:]}"
@@ -78,7 +122,7 @@ def build_run_started_gokey(
         f"&conversation_id={conversation_id}"
         f"&observation_id={observation_id}"
         f"&model={quote(model)}"
-        f"&tool={quote(tool)}"
+        f"&tool={quote(tool) if tool else ''}"
         f"&user_id={user_id}"
     )
 
@@ -126,14 +170,10 @@ def build_run_error_gokey(
         f"&user_id={user_id}"
         f"&error_msg={quote(error_msg)}"
         f"&model={quote(model)}"
-        f"&tool={quote(tool)}"
-        f"&toolName={quote(tool_name)}"
-        f"&toolArgs={quote(tool_args)}"
-        f"&cliVer={IFLOW_CLI_VERSION}"
-        f"&platform={platform.system().lower()}"
-        f"&arch={platform.machine().lower()}"
-        f"&nodeVersion={NODE_VERSION_EMULATED}"
-        f"&osVersion={platform.platform()}"
+        f"&tool={quote(tool) if tool else ''}"
+        f"&toolName={quote(tool_name) if tool_name else ''}"
+        f"&toolArgs={quote(tool_args) if tool_args else ''}"
+        + _ERROR_ENV_SUFFIX
     )
 
 
@@ -153,42 +193,10 @@ def build_vgif_payload(
     Returns:
         URL 编码格式的参数字符串
     """
-    # 获取平台信息
-    system = platform.system()
-    system_lower = system.lower()
-
-    # 简化的平台标识
-    if system_lower.startswith("win"):
-        os_short = "win"
-    elif system_lower == "darwin":
-        os_short = "mac"
-    elif system_lower == "linux":
-        os_short = "linux"
-    else:
-        os_short = system_lower
-
     return (
-        f"logtype=1"
-        f"&title=iFlow-CLI"
-        f"&pre=-"
-        f"&scr={screen_resolution}"
-        f"&cna={cna}"
-        f"&spm-cnt=a2110qe.33796382.46182003.0.0"
-        f"&aplus"
-        f"&pid=iflow"
-        f"&_user_id={user_id}"
-        f"&cache={secrets.token_hex(3)}"
-        f"&sidx=aplusSidex"
-        f"&ckx=aplusCkx"
-        f"&platformType=pc"
-        f"&device_model={system}"
-        f"&os={system}"
-        f"&o={os_short}"
-        f"&node_version={NODE_VERSION_EMULATED}"
-        f"&language=zh_CN.UTF-8"
-        f"&interactive=0"
-        f"&iFlowEnv="
-        f"&_g_encode=utf-8"
+        f"logtype=1&title=iFlow-CLI&pre=-&scr={screen_resolution}&cna={cna}"
+        f"{_VGIF_MIDDLE}{user_id}&cache={os.urandom(3).hex()}"
+        + _VGIF_SUFFIX
     )
 
 
@@ -1,26 +1,92 @@
 """配置加密模块 - 敏感配置加密存储"""
 
-import base64
 import hashlib
-import json
 import logging
 import os
 from pathlib import Path
 from typing import Any, Optional
 
+from . import jsonutil
+
 logger = logging.getLogger("iflow2api")
 
+# 路径在进程生命周期内不变，导入时计算一次
+_APP_DIR = Path.home() / ".iflow2api"
+_KEY_PATH = _APP_DIR / ".key"
+_APP_CONFIG_PATH = _APP_DIR / "config.json"
+_SECURE_CONFIG_PATH = _APP_DIR / "secure_config.json"
+
+# Windows 上 chmod 只能切换只读位，0o600 无意义，直接跳过
+_IS_POSIX = os.name == "posix"
+
 # 尝试导入加密库
 try:
     from cryptography.fernet import Fernet, InvalidToken
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
     HAS_CRYPTOGRAPHY = True
 except ImportError:
     HAS_CRYPTOGRAPHY = False
     Fernet = None
     InvalidToken = Exception
 
+# 可选：pybase64（SIMD 加速的 base64，接口与标准库一致），不可用时回退标准库
+try:
+    import pybase64
+    _b64encode = pybase64.urlsafe_b64encode
+    _b64decode = pybase64.urlsafe_b64decode
+except ImportError:
+    import base64  # 仅回退时导入
+    _b64encode = base64.urlsafe_b64encode
+    _b64decode = base64.urlsafe_b64decode
+
+# 可选：rfernet（Rust 实现的 Fernet，pip install rfernet）
+# 单次调用内完成 AES-CBC + HMAC-SHA256 及 base64，小数据加解密开销远低于 cryptography 的 Python 封装；
+# 令牌格式与标准 Fernet 完全一致，两种后端可互相解密
+try:
+    import rfernet as _rfernet
+    HAS_RFERNET = True
+except ImportError:
+    _rfernet = None
+    HAS_RFERNET = False
+
+
+class _RFernetAdapter:
+    """rfernet.Fernet 适配器，接口与 cryptography 的 Fernet 一致（bytes 密钥/令牌、InvalidToken 异常）
+
+    rfernet 的 encrypt 返回 str 令牌、decrypt 接收 str 令牌，这里在边界处与 bytes 互转
+    """
+
+    __slots__ = ("_fernet",)
+
+    def __init__(self, key: bytes):
+        self._fernet = _rfernet.Fernet(key.decode("ascii"))
+
+    def encrypt(self, data: bytes) -> bytes:
+        return self._fernet.encrypt(data).encode("ascii")
+
+    def decrypt(self, token: bytes) -> bytes:
+        try:
+            return self._fernet.decrypt(token.decode("ascii"))
+        except Exception as e:
+            raise InvalidToken() from e
+
+
+# 导入时确定 Fernet 实现：优先 rfernet，回退 cryptography
+_fernet_cls = _RFernetAdapter if HAS_RFERNET else Fernet
+HAS_FERNET = _fernet_cls is not None
+
+
+def _generate_fernet_key() -> bytes:
+    """生成 Fernet 密钥（32 字节随机数的 url-safe base64，与 Fernet.generate_key() 相同）"""
+    return _b64encode(os.urandom(32))
+
+
+# encrypt_dict 默认加密的敏感字段
+_DEFAULT_SENSITIVE_KEYS = frozenset({
+    "api_key", "apiKey",
+    "oauth_access_token", "oauth_refresh_token",
+    "password", "secret", "token",
+})
+
 
 class ConfigEncryption:
     """配置加密器"""
@@ -33,44 +99,51 @@ class ConfigEncryption:
             key: 加密密钥，如果为 None 则自动生成或从文件加载
         """
         self._key = key
-        self._fernet: Optional[Fernet] = None
-        self._key_path = Path.home() / ".iflow2api" / ".key"
+        self._fernet: Optional[Any] = None
+        self._key_path = _KEY_PATH
 
-        if not HAS_CRYPTOGRAPHY:
+        if not HAS_FERNET:
             logger.warning("cryptography 库未安装，配置加密功能不可用")
             logger.warning("运行 'pip install iflow2api[full]' 或 'pip install cryptography' 启用加密")
             return
 
         if key:
-            self._fernet = Fernet(key)
+            self._fernet = _fernet_cls(key)
         else:
             self._load_or_generate_key()
 
     def _load_or_generate_key(self) -> None:
         """加载或生成密钥（M-06 修复：不再对 Fernet key 做额外 base64 编码）"""
-        if self._key_path.exists():
-            try:
-                # Fernet.generate_key() 返回的本身就是 url-safe base64 bytes
-                # 直接读取文件内容即为 Fernet key
-                self._key = self._key_path.read_bytes().strip()
-                self._fernet = Fernet(self._key)
-                return
-            except Exception as e:
-                logger.warning("加载密鑙失败: %s", e)
+        # 直接读取，文件不存在时走生成分支（省去一次 exists() 的 stat 调用）
+        try:
+            # Fernet.generate_key() 返回的本身就是 url-safe base64 bytes
+            # 直接读取文件内容即为 Fernet key
+            key = self._key_path.read_bytes().strip()
+            if len(key) != 44:
+                # 兼容旧版 rotate_key 写入的、外层多一次 base64 的密钥
+                key = _b64decode(key)
+            self._key = key
+            self._fernet = _fernet_cls(self._key)
+            return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("加载密鑙失败: %s", e)
 
         # 生成新密钥（已是 url-safe base64 bytes，直接存储）
-        self._key = Fernet.generate_key()
-        self._fernet = Fernet(self._key)
+        self._key = _generate_fernet_key()
+        self._fernet = _fernet_cls(self._key)
 
         # 保存密钥
         self._key_path.parent.mkdir(parents=True, exist_ok=True)
         self._key_path.write_bytes(self._key)
 
         # 设置权限（仅所有者可读写）
-        try:
-            os.chmod(self._key_path, 0o600)
-        except Exception:
-            pass
+        if _IS_POSIX:
+            try:
+                os.chmod(self._key_path, 0o600)
+            except OSError:
+                pass
 
     def encrypt(self, data: str) -> str:
         """
@@ -80,20 +153,19 @@ class ConfigEncryption:
             data: 要加密的字符串
 
         Returns:
-            加密后的字符串（Base64 编码）
+            加密后的字符串（Fernet 令牌，本身即为 url-safe base64）
         """
         if not self._fernet:
             return data
 
-        encrypted = self._fernet.encrypt(data.encode('utf-8'))
-        return base64.urlsafe_b64encode(encrypted).decode('utf-8')
+        return self._fernet.encrypt(data.encode('utf-8')).decode('ascii')
 
     def decrypt(self, encrypted_data: str) -> str:
         """
         解密数据
 
         Args:
-            encrypted_data: 加密的字符串（Base64 编码）
+            encrypted_data: 加密的字符串（Fernet 令牌，或旧版外层再做一次 Base64 的格式）
 
         Returns:
             解密后的原始字符串
@@ -102,10 +174,13 @@ class ConfigEncryption:
             return encrypted_data
 
         try:
-            encrypted = base64.urlsafe_b64decode(encrypted_data.encode('utf-8'))
-            decrypted = self._fernet.decrypt(encrypted)
-            return decrypted.decode('utf-8')
-        except InvalidToken:
+            token = encrypted_data.encode('ascii')
+            try:
+                return self._fernet.decrypt(token).decode('utf-8')
+            except InvalidToken:
+                # 兼容旧格式：Fernet 令牌外层多包了一次 base64
+                return self._fernet.decrypt(_b64decode(token)).decode('utf-8')
+        except (InvalidToken, ValueError):
             raise ValueError("解密失败: 无效的加密数据或密钥不匹配")
 
     def encrypt_dict(self, data: dict, sensitive_keys: Optional[list[str]] = None) -> dict:
@@ -119,23 +194,26 @@ class ConfigEncryption:
         Returns:
             加密后的字典
         """
-        if sensitive_keys is None:
-            sensitive_keys = [
-                "api_key", "apiKey",
-                "oauth_access_token", "oauth_refresh_token",
-                "password", "secret", "token",
-            ]
-
-        result = {}
-        for key, value in data.items():
-            if key in sensitive_keys and isinstance(value, str) and value:
-                # 检查是否已加密（以 enc: 开头）
-                if not value.startswith("enc:"):
-                    result[key] = f"enc:{self.encrypt(value)}"
-                else:
-                    result[key] = value
-            else:
-                result[key] = value
+        keys = _DEFAULT_SENSITIVE_KEYS if sensitive_keys is None else frozenset(sensitive_keys)
+
+        # 先整体复制（C 层完成），再只覆盖需要加密的字段；已有键赋值不改变顺序
+        result = dict(data)
+        # 只处理字典中实际存在的敏感字段（集合交集在 C 层完成），没有则直接返回
+        hits = keys & data.keys()
+        if not hits or not self._fernet:
+            return result
+
+        # 跳过非字符串、空值和已加密（以 enc: 开头）的值
+        todo = [
+            key for key in hits
+            if isinstance((value := data[key]), str) and value and not value.startswith("enc:")
+        ]
+        if not todo:
+            return result
+
+        encrypt = self._fernet.encrypt
+        for key in todo:
+            result[key] = "enc:" + encrypt(data[key].encode('utf-8')).decode('ascii')
 
         return result
 
@@ -149,15 +227,18 @@ class ConfigEncryption:
         Returns:
             解密后的字典
         """
-        result = {}
+        result = dict(data)
+        # 大多数配置没有加密字段：any() 遇到第一个即停止，没有则省去逐项解密
+        if not any(isinstance(v, str) and v.startswith("enc:") for v in data.values()):
+            return result
+
+        decrypt = self.decrypt
         for key, value in data.items():
             if isinstance(value, str) and value.startswith("enc:"):
                 try:
-                    result[key] = self.decrypt(value[4:])  # 去掉 "enc:" 前缀
+                    result[key] = decrypt(value[4:])  # 去掉 "enc:" 前缀
                 except ValueError:
-                    result[key] = value  # 解密失败，保留原值
-            else:
-                result[key] = value
+                    pass  # 解密失败，保留原值
 
         return result
 
@@ -180,30 +261,41 @@ class ConfigEncryption:
 
         try:
             # 读取当前配置
-            config_path = Path.home() / ".iflow2api" / "config.json"
-            if config_path.exists():
-                with open(config_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # 解密当前数据
-                decrypted = self.decrypt_dict(data)
-
-                # 生成新密钥
-                new_key = Fernet.generate_key()
-                new_fernet = Fernet(new_key)
-
-                # 用新密钥加密
-                self._fernet = new_fernet
-                encrypted = self.encrypt_dict(decrypted)
-
-                # 保存
-                with open(config_path, "w", encoding="utf-8") as f:
-                    json.dump(encrypted, f, indent=2, ensure_ascii=False)
-
-                # 更新密钥文件
-                self._key_path.write_bytes(base64.urlsafe_b64encode(new_key))
+            config_path = _APP_CONFIG_PATH
+            try:
+                raw = config_path.read_bytes()
+            except FileNotFoundError:
+                return False
+            data = jsonutil.loads(raw)
+
+            # 生成新密钥
+            new_key = _generate_fernet_key()
+            new_fernet = _fernet_cls(new_key)
+
+            # 逐个令牌轮换：旧密钥解密后立即用新密钥加密，不构建完整的明文字典；
+            # 只处理已加密的值，明文字段保持原样
+            decrypt = self.decrypt
+            encrypt = new_fernet.encrypt
+            rotated = dict(data)
+            for key, value in data.items():
+                if isinstance(value, str) and value.startswith("enc:"):
+                    try:
+                        plain = decrypt(value[4:])
+                    except ValueError:
+                        continue  # 无法解密，保留原值
+                    rotated[key] = "enc:" + encrypt(plain.encode('utf-8')).decode('ascii')
+
+            # 保存
+            config_path.write_bytes(jsonutil.dumps_pretty(rotated))
+
+            # 更新密钥文件（Fernet 密钥本身即为 url-safe base64，直接存储，与 _load_or_generate_key 一致）
+            self._key_path.write_bytes(new_key)
+
+            # 写入成功后再切换内存中的密钥
+            self._key = new_key
+            self._fernet = new_fernet
 
-                return True
+            return True
         except Exception as e:
             logger.error("密鑙轮换失败: %s", e)
 
@@ -221,20 +313,12 @@ def derive_key_from_password(password: str, salt: Optional[bytes] = None) -> tup
     Returns:
         (密钥, 盐值)
     """
-    if not HAS_CRYPTOGRAPHY:
-        raise RuntimeError("cryptography 库未安装")
-
     if salt is None:
         salt = os.urandom(16)
 
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=480000,
-    )
-
-    key = base64.urlsafe_b64encode(kdf.derive(password.encode('utf-8')))
+    # PBKDF2-HMAC-SHA256：hashlib 直接调用 OpenSSL 实现，无需 cryptography
+    raw = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 480000, dklen=32)
+    key = _b64encode(raw)
     return key, salt
 
 
@@ -248,9 +332,22 @@ class SecureConfig:
         Args:
             config_path: 配置文件路径
         """
-        self._config_path = config_path or Path.home() / ".iflow2api" / "secure_config.json"
-        self._encryption = ConfigEncryption()
+        self._config_path = config_path or _SECURE_CONFIG_PATH
+        # 延迟创建：只有遇到加密值或敏感字段时才加载/生成密钥
+        self._encryption: Optional[ConfigEncryption] = None
         self._cache: dict = {}
+        # 是否已加载，以及加载时文件的 mtime（文件未变化时 load() 直接返回缓存，不再解密）
+        self._loaded = False
+        self._mtime: Optional[int] = None
+        # 配置目录只需创建一次
+        self._dir_created = False
+
+    @property
+    def _enc(self) -> ConfigEncryption:
+        """按需创建加密器（首次访问时才读取或生成密钥文件）"""
+        if self._encryption is None:
+            self._encryption = ConfigEncryption()
+        return self._encryption
 
     def load(self) -> dict:
         """
@@ -259,18 +356,30 @@ class SecureConfig:
         Returns:
             配置字典
         """
-        if not self._config_path.exists():
+        try:
+            mtime = self._config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._cache = {}
+            self._loaded = True
+            self._mtime = None
             return {}
 
+        if self._loaded and mtime == self._mtime:
+            return self._cache
+
         try:
-            with open(self._config_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            raw = self._config_path.read_bytes()
+            data = jsonutil.loads(raw)
 
-            # 解密敏感字段
-            if self._encryption.is_available:
-                data = self._encryption.decrypt_dict(data)
+            # 解密敏感字段：先在原始字节中查找 "enc: 前缀，没有加密值时不创建加密器、不遍历字典
+            if b'"enc:' in raw:
+                enc = self._enc
+                if enc.is_available:
+                    data = enc.decrypt_dict(data)
 
             self._cache = data
+            self._loaded = True
+            self._mtime = mtime
             return data
         except Exception as e:
             logger.error("加载配置失败: %s", e)
@@ -287,22 +396,34 @@ class SecureConfig:
             是否成功
         """
         try:
-            # 加密敏感字段
-            if self._encryption.is_available:
-                data = self._encryption.encrypt_dict(data)
-
-            self._config_path.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(self._config_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            # 设置权限
+            # 加密敏感字段（缓存中保留明文）
+            stored = data
+            if not _DEFAULT_SENSITIVE_KEYS.isdisjoint(data):
+                enc = self._enc
+                if enc.is_available:
+                    stored = enc.encrypt_dict(data)
+
+            if not self._dir_created:
+                self._config_path.parent.mkdir(parents=True, exist_ok=True)
+                self._dir_created = True
+
+            # 先写临时文件、设置权限，再原子替换，避免写入中途崩溃导致配置文件被截断
+            tmp_path = self._config_path.with_name(self._config_path.name + ".tmp")
             try:
-                os.chmod(self._config_path, 0o600)
-            except Exception:
-                pass
+                tmp_path.write_bytes(jsonutil.dumps_pretty(stored))
+                if _IS_POSIX:
+                    try:
+                        os.chmod(tmp_path, 0o600)
+                    except OSError:
+                        pass
+                os.replace(tmp_path, self._config_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
 
             self._cache = data
+            self._loaded = True
+            self._mtime = self._config_path.stat().st_mtime_ns
             return True
         except Exception as e:
             logger.error("保存配置失败: %s", e)
@@ -319,7 +440,7 @@ class SecureConfig:
         Returns:
             配置值
         """
-        if not self._cache:
+        if not self._loaded:
             self.load()
         return self._cache.get(key, default)
 
@@ -334,9 +455,13 @@ class SecureConfig:
         Returns:
             是否成功
         """
-        if not self._cache:
+        if not self._loaded:
             self.load()
 
+        # 值未变化时无需重新加密和写盘
+        if key in self._cache and self._cache[key] == value:
+            return True
+
         self._cache[key] = value
         return self.save(self._cache)
 
@@ -350,7 +475,7 @@ class SecureConfig:
         Returns:
             是否成功
         """
-        if not self._cache:
+        if not self._loaded:
             self.load()
 
         if key in self._cache:
@@ -2,10 +2,11 @@
 
 import flet as ft
 import logging
-from datetime import datetime
+import queue
+import time
+from collections import deque
 from typing import Optional
 import threading
-import webbrowser
 import asyncio
 import sys
 
@@ -30,6 +31,40 @@ from .updater import (
 
 logger = logging.getLogger("iflow2api")
 
+# macOS 上 pystray 必须在主线程运行 AppKit 事件循环，而主线程由 Flet 占用
+_IS_MACOS = sys.platform == "darwin"
+# pystray/PIL 是否可用在导入时即已确定
+_TRAY_AVAILABLE = is_tray_available()
+
+# 语言包随程序发布，运行期间不会变化：导入时扫描一次 locales 目录
+_AVAILABLE_LANGUAGES = get_available_languages()
+
+# 服务状态 -> 状态图标颜色 / 状态文本的翻译键（RUNNING、ERROR 的文本为带参数模板）
+_STATE_COLORS = {
+    ServerState.STOPPED: ft.Colors.GREY,
+    ServerState.STARTING: ft.Colors.ORANGE,
+    ServerState.RUNNING: ft.Colors.GREEN,
+    ServerState.STOPPING: ft.Colors.ORANGE,
+    ServerState.ERROR: ft.Colors.RED,
+}
+_STATE_TEXT_KEYS = {
+    ServerState.STOPPED: "server.status_stopped",
+    ServerState.STARTING: "server.status_starting",
+    ServerState.RUNNING: "server.status_running",
+    ServerState.STOPPING: "server.status_stopping",
+    ServerState.ERROR: "server.status_error",
+}
+
+# 设置写盘线程的退出哨兵
+_SAVE_STOP = object()
+
+# 主题设置值 -> Flet 主题模式（未知值按浅色处理）
+_THEME_MAP = {
+    "system": ft.ThemeMode.SYSTEM,  # 跟随系统主题
+    "dark": ft.ThemeMode.DARK,
+    "light": ft.ThemeMode.LIGHT,
+}
+
 
 class IFlow2ApiApp:
     """iflow2api GUI 应用"""
@@ -37,6 +72,9 @@ class IFlow2ApiApp:
     def __init__(self, page: ft.Page):
         self.page = page
         self.settings = load_settings()
+        # 最近一次交给写盘线程（或加载）时的设置内容，用于跳过未变化的保存；
+        # 写入失败时置为 None，下一次保存必定重新写盘
+        self._last_queued_snapshot: Optional[dict] = self.settings.model_dump()
 
         # 初始化文件日志（使 Web /admin/logs 接口可读到运行日志）
         setup_file_logging()
@@ -47,6 +85,14 @@ class IFlow2ApiApp:
 
         # 设置语言
         set_language(self.settings.language)
+        self._build_state_config()
+
+        # 设置在后台线程写盘：单槽队列，连续多次保存只写最后一次
+        self._save_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._settings_writer_thread = threading.Thread(
+            target=self._settings_writer, name="settings-writer", daemon=True
+        )
+        self._settings_writer_thread.start()
 
         # 设置 pubsub 用于线程安全的 UI 更��
         self.page.pubsub.subscribe(self._on_pubsub_message)
@@ -69,6 +115,35 @@ class IFlow2ApiApp:
         self.start_btn: Optional[ft.Button] = None
         self.stop_btn: Optional[ft.Button] = None
         self.log_list: Optional[ft.ListView] = None
+        # 上一次显示的服务状态，用于跳过重复的状态通知
+        self._last_state: Optional[ServerState] = None
+        self._last_status_text = ""
+        # 提示条（SnackBar）在各次提示间复用
+        self._snack_text = ft.Text("")
+        self._snack_bar = ft.SnackBar(content=self._snack_text)
+        # 设置对话框首次打开时构建并缓存，切换语言后失效
+        self._settings_dlg: Optional[ft.AlertDialog] = None
+        self._settings_refresh = None
+        # 日志列表的有界镜像（最多 100 条），淘汰旧日志为 O(1)
+        self._log_ring: deque[ft.Text] = deque(maxlen=100)
+        # 尚未显示的日志文本（由 _flush_updates 批量创建控件）
+        self._pending_logs: deque[str] = deque(maxlen=100)
+        # 窗口是否可见（隐藏到托盘时暂停渲染日志）
+        self._window_visible = True
+        # 时间戳按秒缓存，同一秒内的多条日志不重复格式化
+        self._log_ts_second = -1
+        self._log_ts = ""
+
+        # 合并 UI 刷新：一帧（约 16ms）内被修改的控件只发送一次 page.update(*controls)，
+        # 由唯一的刷新线程执行；_update_lock 只保护待刷新集合与待显示日志
+        self._dirty: set[ft.Control] = set()
+        self._full_update = False
+        self._update_lock = threading.Lock()
+        # 页面锁：刷新线程修改日志控件并 page.update，与其他线程的 page.update/open/close
+        # （提示条、对话框、退出等）都在此锁内进行，避免控件树在序列化时被修改
+        self._ui_lock = threading.RLock()
+        self._update_event = threading.Event()
+        threading.Thread(target=self._update_loop, name="ui-flusher", daemon=True).start()
 
         self._setup_page()
         self._build_ui()
@@ -82,10 +157,24 @@ class IFlow2ApiApp:
         if self.settings.start_minimized:
             self.page.window.minimized = True
 
+        # 初始化完成后统一同步一次（包括上面的最小化等窗口属性）
+        self._page_update()
+
         # 启动时检查更新
         if self.settings.check_update_on_startup:
             self._check_for_updates_async(silent=True)
 
+        # 界面已构建，在后台预先导入 OAuth 登录模块，首次点击登录时无需在 UI 线程中导入
+        threading.Thread(target=self._prefetch_oauth_module, name="oauth-prefetch", daemon=True).start()
+
+    @staticmethod
+    def _prefetch_oauth_module():
+        """预导入 OAuth 登录模块（失败时忽略，点击登录时会再次导入并报错）"""
+        try:
+            from . import oauth_login  # noqa: F401
+        except Exception as e:
+            logger.debug("预导入 OAuth 模块失败: %s", e)
+
     def _setup_page(self):
         """设置页面"""
         self.page.title = "iflow2api"
@@ -107,45 +196,38 @@ class IFlow2ApiApp:
         # 窗口关闭事件
         self.page.window.on_event = self._on_window_event
 
-        # 立即更新以确保 prevent_close 同步到 Flutter 客户端
-        self.page.update()
+        # 不在此处单独 update：紧接着 _build_ui() 中的 page.add() 会把 prevent_close 等
+        # 窗口属性连同界面一起同步到 Flutter 客户端，此前用户无法与窗口交互
 
     def _apply_theme(self):
         """应用主题设置"""
-        theme_mode = self.settings.theme_mode
-        if theme_mode == "system":
-            # 跟随系统主题
-            self.page.theme_mode = ft.ThemeMode.SYSTEM
-        elif theme_mode == "dark":
-            self.page.theme_mode = ft.ThemeMode.DARK
-        else:
-            self.page.theme_mode = ft.ThemeMode.LIGHT
+        self.page.theme_mode = _THEME_MAP.get(self.settings.theme_mode, ft.ThemeMode.LIGHT)
 
     def _on_window_event(self, e: ft.WindowEvent):
         """窗口事件处理"""
         if e.type == ft.WindowEventType.CLOSE:
             close_action = self.settings.close_action
-            is_macos = sys.platform == "darwin"
             logger.debug("窗口关闭事件, close_action=%s, platform=%s", close_action, sys.platform)
             
             if close_action == "minimize_to_tray":
-                if is_tray_available() and not is_macos:
+                if _TRAY_AVAILABLE and not _IS_MACOS:
                     # Windows/Linux: 最小化到系统托盘 - 隐藏窗口
                     logger.debug("最小化到系统托盘 (visible=False)")
                     self.page.window.visible = False
-                    self.page.update()
+                    self._window_visible = False
+                    self._mark_dirty()
                 else:
                     # macOS 或 托盘不可用: 回退到最小化到任务栏/Dock
                     # macOS 上 pystray 需要主线程运行，与 Flet 冲突，因此无法显示托盘图标
                     # 为防止窗口丢失，强制使用最小化
-                    logger.debug("%s，回退到最小化到任务栏/Dock", 'macOS' if is_macos else '托盘不可用')
+                    logger.debug("%s，回退到最小化到任务栏/Dock", 'macOS' if _IS_MACOS else '托盘不可用')
                     self.page.window.minimized = True
-                    self.page.update()
+                    self._mark_dirty()
             elif close_action == "minimize_to_taskbar":
                 # 最小化到任务栏
                 logger.debug("最小化到任务栏")
                 self.page.window.minimized = True
-                self.page.update()
+                self._mark_dirty()
             else:
                 # 直接退出
                 logger.debug("直接退出")
@@ -153,7 +235,9 @@ class IFlow2ApiApp:
 
     def _setup_tray(self):
         """设置系统托盘"""
-        if not is_tray_available():
+        # macOS 上托盘线程无法运行 AppKit 事件循环，启动只会留下一个无用的后台线程，
+        # 关闭窗口时也会回退为最小化到 Dock，因此直接跳过
+        if not _TRAY_AVAILABLE or _IS_MACOS:
             return
 
         self.tray = TrayManager(
@@ -164,12 +248,19 @@ class IFlow2ApiApp:
         )
         self.tray.start()
 
+    def _post_to_main(self, message: dict):
+        """从后台线程（托盘、服务、日志）向主线程投递 pubsub 消息
+
+        页面已销毁（如退出过程中）时发送会失败，此时消息已无意义，记录后丢弃
+        """
+        try:
+            self.page.pubsub.send_all(message)
+        except Exception as e:
+            logger.debug("pubsub 消息发送失败 (%s): %s", message.get("type"), e)
+
     def _show_window_from_tray(self):
         """从托盘显示主窗口（在 pystray 后台线程中调用，需通过 pubsub 中转到主线程）"""
-        try:
-            self.page.pubsub.send_all({"type": "tray_show_window"})
-        except Exception:
-            pass
+        self._post_to_main({"type": "tray_show_window"})
 
     def _show_window_from_tray_main(self):
         """从托盘显示主窗口 - 主线程执行"""
@@ -177,30 +268,23 @@ class IFlow2ApiApp:
             self.page.window.visible = True
             self.page.window.minimized = False
             self.page.window.focused = True
-            self.page.update()
+            # 窗口重新可见：本次完整刷新时会一并补上隐藏期间缓存的日志
+            self._window_visible = True
+            self._mark_dirty()
         except Exception:
             pass
 
     def _start_server_from_tray(self):
         """从托盘启动服务（在 pystray 后台线程中调用，需通过 pubsub 中转到主线程）"""
-        try:
-            self.page.pubsub.send_all({"type": "tray_start_server"})
-        except Exception:
-            pass
+        self._post_to_main({"type": "tray_start_server"})
 
     def _stop_server_from_tray(self):
         """从托盘停止服务（在 pystray 后台线程中调用，需通过 pubsub 中转到主线程）"""
-        try:
-            self.page.pubsub.send_all({"type": "tray_stop_server"})
-        except Exception:
-            pass
+        self._post_to_main({"type": "tray_stop_server"})
 
     def _quit_app_from_tray(self):
         """从托盘退出应用（在 pystray 后台线程中调用，需通过 pubsub 中转到主线程）"""
-        try:
-            self.page.pubsub.send_all({"type": "tray_quit"})
-        except Exception:
-            pass
+        self._post_to_main({"type": "tray_quit"})
 
     def _quit_app(self):
         """退出应用"""
@@ -213,6 +297,9 @@ class IFlow2ApiApp:
         # 移除 GUI 日志 handler，避免向已销毁的 page 发送消息
         remove_gui_log_handler(self.page)
 
+        # 写入尚未落盘的设置
+        self._stop_settings_writer()
+
         # 停止服务和托盘
         if hasattr(self, "server"):
             self.server.stop()
@@ -222,7 +309,7 @@ class IFlow2ApiApp:
         try:
             # 尝试正常关闭窗口
             self.page.window.prevent_close = False
-            self.page.update()
+            self._page_update()
             
             # 定义销毁窗口的异步函数
             async def destroy_window():
@@ -257,8 +344,9 @@ class IFlow2ApiApp:
     def _build_ui(self):
         """构建 UI"""
         # 状态栏
-        self.status_icon = ft.Icon(ft.Icons.CIRCLE, color=ft.Colors.GREY, size=16)
-        self.status_text = ft.Text(t("server.status_stopped"), size=14)
+        # 初始状态直接取 _build_state_config() 已翻译好的“已停止”
+        self.status_icon = ft.Icon(ft.Icons.CIRCLE, color=_STATE_COLORS[ServerState.STOPPED], size=16)
+        self.status_text = ft.Text(self._state_texts[ServerState.STOPPED], size=14)
 
         status_row = ft.Container(
             content=ft.Row([self.status_icon, self.status_text]),
@@ -279,6 +367,7 @@ class IFlow2ApiApp:
             value=str(self.settings.port),
             hint_text="28000",
             keyboard_type=ft.KeyboardType.NUMBER,
+            input_filter=ft.NumbersOnlyInputFilter(),
             width=120,
         )
 
@@ -403,7 +492,7 @@ class IFlow2ApiApp:
         )
 
         # 组装页面
-        self.page.add(
+        self._page_add(
             ft.Column(
                 [
                     status_row,
@@ -422,126 +511,238 @@ class IFlow2ApiApp:
 
     def _show_snack_bar(self, message: str, color: str = ft.Colors.GREEN):
         """显示 SnackBar 提示"""
-        sb = ft.SnackBar(content=ft.Text(message), bgcolor=color)
+        # 复用同一个 SnackBar，只更新文本和颜色
+        self._snack_text.value = message
+        sb = self._snack_bar
+        sb.bgcolor = color
         if hasattr(self.page, "open"):
             try:
-                self.page.open(sb)
+                self._page_open(sb)
             except Exception:
                 self.page.snack_bar = sb
                 sb.open = True
-                self.page.update()
+                self._page_update()
         else:
             self.page.snack_bar = sb
             sb.open = True
+            self._page_update()
+
+    def _mark_dirty(self, *controls: ft.Control):
+        """标记需要刷新的控件，并安排在下一帧统一刷新
+
+        不传控件时表示页面/窗口属性有变化，下一帧执行一次完整的 page.update()
+        """
+        with self._update_lock:
+            if controls:
+                self._dirty.update(controls)
+            else:
+                self._full_update = True
+        self._update_event.set()
+
+    def _update_loop(self):
+        """刷新线程：有控件被标记后等待一帧，合并期间的所有修改再统一刷新"""
+        while True:
+            self._update_event.wait()
+            time.sleep(0.016)
+            # 先清除再刷新：刷新过程中新标记的控件会再次触发下一轮
+            self._update_event.clear()
+            self._flush_updates()
+
+    def _flush_updates(self):
+        """一次性刷新本帧内所有被标记的控件"""
+        with self._ui_lock:
+            self._drain_pending_logs()
+            with self._update_lock:
+                dirty = list(self._dirty)
+                self._dirty.clear()
+                full_update = self._full_update
+                self._full_update = False
+            try:
+                if full_update:
+                    # 完整刷新已包含所有控件的变化
+                    self.page.update()
+                elif dirty:
+                    self.page.update(*dirty)
+            except Exception as e:
+                # 窗口已销毁等情况下刷新失败，忽略即可
+                logger.debug("刷新 UI 失败: %s", e)
+
+    def _page_update(self):
+        """在页面锁内执行 page.update()（刷新线程之外的调用方使用）"""
+        with self._ui_lock:
             self.page.update()
 
+    def _page_add(self, *controls: ft.Control):
+        """在页面锁内向页面添加控件"""
+        with self._ui_lock:
+            self.page.add(*controls)
+
+    def _page_open(self, control: ft.Control):
+        """在页面锁内打开对话框/提示条"""
+        with self._ui_lock:
+            self.page.open(control)
+
+    def _page_close(self, control: ft.Control):
+        """在页面锁内关闭对话框"""
+        with self._ui_lock:
+            self.page.close(control)
+
     def _add_log(self, message: str):
         """添加日志"""
         # log_list 在 _build_ui() 中创建，防御性检查避免过早调用崩溃
         if self.log_list is None:
             return
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_list.controls.append(
-            ft.Text(f"[{timestamp}] {message}", size=12, selectable=True)
-        )
-        # 限制日志数量
-        if len(self.log_list.controls) > 100:
-            self.log_list.controls.pop(0)
-        self.page.update()
+        now = int(time.time())
+        if now != self._log_ts_second:
+            self._log_ts_second = now
+            self._log_ts = time.strftime("%H:%M:%S", time.localtime(now))
+
+        # 只记录文本，控件在刷新时批量创建；一帧内超过 100 条时旧的直接丢弃，不再创建控件
+        with self._update_lock:
+            self._pending_logs.append(f"[{self._log_ts}] {message}")
+        # 窗口隐藏到托盘时只缓存最近的日志，不创建控件也不刷新，显示窗口时再补上
+        if self._window_visible:
+            self._mark_dirty(self.log_list)
+
+    def _drain_pending_logs(self):
+        """将待显示的日志批量加入日志列表（在刷新线程中、页面锁内调用）"""
+        if not self._window_visible:
+            return
+        with self._update_lock:
+            if not self._pending_logs:
+                return
+            lines = list(self._pending_logs)
+            self._pending_logs.clear()
+
+        new_controls = [ft.Text(line, size=12, selectable=True) for line in lines]
+        # 限制日志数量：deque 满时自动淘汰最旧的日志，此时用切片赋值整体替换内容
+        # （复用 Flet 持有的同一个列表对象，不另建新列表）
+        ring = self._log_ring
+        overflow = len(ring) + len(new_controls) > ring.maxlen
+        ring.extend(new_controls)
+        if overflow:
+            self.log_list.controls[:] = ring
+        else:
+            self.log_list.controls.extend(new_controls)
+
+    def _handle_server_state(self, message: dict):
+        self._on_server_state_change(message["state"], message["message"])
+
+    def _handle_oauth_success(self, message: dict):
+        # OAuth 登录成功，更新 UI
+        api_key = message.get("api_key", "")
+        base_url = message.get("base_url", "")
+        self.api_key_field.value = api_key
+        self.base_url_field.value = base_url
+        self.settings.api_key = api_key
+        self.settings.base_url = base_url
+        self._add_log(t("log.config_updated"))
+        self._show_snack_bar(t("message.login_success"))
+        self._mark_dirty(self.api_key_field, self.base_url_field)
+
+    def _handle_add_log(self, message: dict):
+        # 从后台线程添加日志
+        self._add_log(message.get("message", ""))
+
+    def _handle_update_available(self, message: dict):
+        # 发现新版本
+        self._show_update_dialog(message.get("release_info", {}))
+
+    def _handle_no_update(self, message: dict):
+        # 已是最新版本 - 显示对话框
+        self._show_no_update_dialog()
+
+    def _handle_update_error(self, message: dict):
+        # 检查更新出错
+        error = message.get("error", "Unknown error")
+        self._show_snack_bar(t("update.error", error=error), color=ft.Colors.RED)
+        self._add_log(t("update.error", error=error))
+
+    def _handle_tray_show_window(self, message: dict):
+        # 从托盘显示主窗口
+        self._show_window_from_tray_main()
+
+    def _handle_tray_start_server(self, message: dict):
+        # 从托盘启动服务
+        self._start_server(None)
+
+    def _handle_tray_stop_server(self, message: dict):
+        # 从托盘停止服务
+        self._stop_server(None)
+
+    def _handle_tray_quit(self, message: dict):
+        # 从托盘退出应用
+        self._is_quitting = True
+        self._quit_app()
+
+    # pubsub 消息类型 -> 处理方法（一次字典查找代替 if/elif 链）
+    _PUBSUB_HANDLERS = {
+        "server_state": _handle_server_state,
+        "oauth_success": _handle_oauth_success,
+        "add_log": _handle_add_log,
+        "update_available": _handle_update_available,
+        "no_update": _handle_no_update,
+        "update_error": _handle_update_error,
+        "tray_show_window": _handle_tray_show_window,
+        "tray_start_server": _handle_tray_start_server,
+        "tray_stop_server": _handle_tray_stop_server,
+        "tray_quit": _handle_tray_quit,
+    }
 
     def _on_pubsub_message(self, message):
         """处理 pubsub 消息 - 在主线程中执行"""
         if not isinstance(message, dict):
             return
-        
-        msg_type = message.get("type")
-        
-        if msg_type == "server_state":
-            state = message["state"]
-            msg = message["message"]
-            self._on_server_state_change(state, msg)
-        
-        elif msg_type == "oauth_success":
-            # OAuth 登录成功，更新 UI
-            api_key = message.get("api_key", "")
-            base_url = message.get("base_url", "")
-            self.api_key_field.value = api_key
-            self.base_url_field.value = base_url
-            self.settings.api_key = api_key
-            self.settings.base_url = base_url
-            self._add_log(t("log.config_updated"))
-            self._show_snack_bar(t("message.login_success"))
-            self.page.update()
-        
-        elif msg_type == "add_log":
-            # 从后台线程添加日志
-            log_msg = message.get("message", "")
-            self._add_log(log_msg)
-        
-        elif msg_type == "update_available":
-            # 发现新版本
-            release_info = message.get("release_info", {})
-            self._show_update_dialog(release_info)
-        
-        elif msg_type == "no_update":
-            # 已是最新版本 - 显示对话框
-            self._show_no_update_dialog()
-        
-        elif msg_type == "update_error":
-            # 检查更新出错
-            error = message.get("error", "Unknown error")
-            self._show_snack_bar(t("update.error", error=error), color=ft.Colors.RED)
-            self._add_log(t("update.error", error=error))
-        
-        elif msg_type == "tray_show_window":
-            # 从托盘显示主窗口
-            self._show_window_from_tray_main()
-        
-        elif msg_type == "tray_start_server":
-            # 从托盘启动服务
-            self._start_server(None)
-        
-        elif msg_type == "tray_stop_server":
-            # 从托盘停止服务
-            self._stop_server(None)
-        
-        elif msg_type == "tray_quit":
-            # 从托盘退出应用
-            self._is_quitting = True
-            self._quit_app()
+        handler = self._PUBSUB_HANDLERS.get(message.get("type"))
+        if handler is not None:
+            handler(self, message)
 
     def _on_server_state_change_threadsafe(self, state: ServerState, message: str):
         """服务状态变化回调 - 线程安全版本，从后台线程调用"""
         # 通过 pubsub 发送消息到主线程
-        try:
-            self.page.pubsub.send_all(
-                {"type": "server_state", "state": state, "message": message}
-            )
-        except Exception:
-            pass
+        self._post_to_main({"type": "server_state", "state": state, "message": message})
+
+    def _build_state_config(self):
+        """按当前语言翻译服务状态文本（带参数的只缓存模板），切换语言时重建"""
+        self._state_texts = {state: t(key) for state, key in _STATE_TEXT_KEYS.items()}
+        self._state_unknown_text = t("server.status_unknown")
 
     def _on_server_state_change(self, state: ServerState, message: str):
         """服务状态变化回调 - 必须在主线程调用"""
-        state_config = {
-            ServerState.STOPPED: (ft.Colors.GREY, t("server.status_stopped")),
-            ServerState.STARTING: (ft.Colors.ORANGE, t("server.status_starting")),
-            ServerState.RUNNING: (
-                ft.Colors.GREEN,
-                t("server.status_running", url=f"http://{self.settings.host}:{self.settings.port}"),
-            ),
-            ServerState.STOPPING: (ft.Colors.ORANGE, t("server.status_stopping")),
-            ServerState.ERROR: (ft.Colors.RED, t("server.status_error", error=message)),
-        }
-
-        color, text = state_config.get(state, (ft.Colors.GREY, t("server.status_unknown")))
-        self.status_icon.color = color
-        self.status_text.value = text
+        color = _STATE_COLORS.get(state, ft.Colors.GREY)
+        text = self._state_texts.get(state, self._state_unknown_text)
+        # 带参数的状态文本用缓存的模板格式化
+        if state == ServerState.RUNNING:
+            text = text.format(url=f"http://{self.settings.host}:{self.settings.port}")
+        elif state == ServerState.ERROR:
+            text = text.format(error=message)
+
+        # 与上一次状态完全相同（多个组件重复通知）时不做任何更新
+        if state == self._last_state and text == self._last_status_text:
+            return
+        self._last_state = state
+        self._last_status_text = text
+
+        # 只标记值实际发生变化的控件
+        dirty = []
+        if self.status_icon.color != color:
+            self.status_icon.color = color
+            dirty.append(self.status_icon)
+        if self.status_text.value != text:
+            self.status_text.value = text
+            dirty.append(self.status_text)
 
         # 更新按钮状态
         is_running = state == ServerState.RUNNING
         is_busy = state in (ServerState.STARTING, ServerState.STOPPING)
-        self.start_btn.disabled = is_running or is_busy
-        self.stop_btn.disabled = not is_running or is_busy
+        start_disabled = is_running or is_busy
+        stop_disabled = not is_running or is_busy
+        if self.start_btn.disabled != start_disabled:
+            self.start_btn.disabled = start_disabled
+            dirty.append(self.start_btn)
+        if self.stop_btn.disabled != stop_disabled:
+            self.stop_btn.disabled = stop_disabled
+            dirty.append(self.stop_btn)
 
         # 更新托盘状态
         if self.tray:
@@ -555,7 +756,8 @@ class IFlow2ApiApp:
                 self.tray.update_status(False, "normal")
 
         self._add_log(text)
-        self.page.update()
+        if dirty:
+            self._mark_dirty(*dirty)
 
     def _start_server(self, e):
         """启动服务"""
@@ -564,34 +766,118 @@ class IFlow2ApiApp:
             self._add_log(t("log.server_starting"))
 
     def _stop_server(self, e):
-        """停止服务"""
+        """停止服务（stop() 会等待服务线程退出最多 5 秒，放到后台线程执行，避免阻塞界面）"""
+        threading.Thread(target=self._stop_server_worker, name="server-stop", daemon=True).start()
+
+    def _stop_server_worker(self):
+        """后台线程：停止服务，状态变化和日志都经 pubsub 回到主线程"""
         if self.server.stop():
-            self._add_log(t("log.server_stopping"))
+            self._add_log_threadsafe(t("log.server_stopping"))
+
+    def _queue_save_settings(self):
+        """将当前设置的快照交给后台线程保存（队列中未写入的旧快照被替换）
+
+        与上次排队的内容相同时直接跳过，不重复写盘。比较对象是最近一次排队而非写完的快照：
+        否则在旧快照写完之前改回原值，会被误判为未变化而跳过，最终磁盘上留下的是旧快照
+        """
+        # 退出流程已让写盘线程结束，不再接受新的保存
+        if getattr(self, "_is_quitting_process", False):
+            return
+        dumped = self.settings.model_dump()
+        if dumped == self._last_queued_snapshot:
+            return
+        self._last_queued_snapshot = dumped
+        snapshot = self.settings.model_copy()
+        while True:
+            try:
+                self._save_queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                try:
+                    self._save_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _write_settings(self, settings: AppSettings):
+        """写入设置文件（save_settings 内部已加锁串行化），失败时记录日志"""
+        try:
+            save_settings(settings)
+        except Exception as e:
+            logger.error("保存设置失败: %s", e)
+            # 回滚排队快照，之后相同内容的保存仍会重试
+            self._last_queued_snapshot = None
+
+    def _settings_writer(self):
+        """后台写盘线程，收到 _SAVE_STOP 后退出"""
+        while True:
+            settings = self._save_queue.get()
+            if settings is _SAVE_STOP:
+                return
+            self._write_settings(settings)
+
+    def _stop_settings_writer(self):
+        """退出前让后台线程写完队列中的设置并结束，等待其完成"""
+        writer = self._settings_writer_thread
+        if writer.is_alive():
+            try:
+                # 队列满时阻塞到写盘线程取走待写快照，保证哨兵排在其后
+                self._save_queue.put(_SAVE_STOP, timeout=5)
+            except queue.Full:
+                pass
+            writer.join(timeout=5)
+            return
+        # 写盘线程意外退出：在当前线程写入剩余的快照
+        try:
+            settings = self._save_queue.get_nowait()
+        except queue.Empty:
+            return
+        if settings is not _SAVE_STOP:
+            self._write_settings(settings)
 
     def _save_settings(self, e):
         """保存配置"""
         self._update_settings_from_ui()
-        save_settings(self.settings)
+        self._queue_save_settings()
         self._add_log(t("log.settings_saved"))
 
         # 显示提示
         self._show_snack_bar(t("message.settings_saved"))
 
     def _show_settings_dialog(self, e):
-        """显示应用设置对话框"""
+        """显示应用设置对话框（首次打开时构建，之后复用并只刷新控件的值）"""
+        if self._settings_dlg is None:
+            self._settings_dlg, self._settings_refresh = self._build_settings_dialog()
+            is_new = True
+        else:
+            is_new = False
+        dlg = self._settings_dlg
+        self._settings_refresh()
+
+        # 打开对话框
+        if hasattr(self.page, "open"):
+            self._page_open(dlg)
+        else:
+            dlg.open = True
+            if is_new:
+                self._page_add(dlg)
+            self._page_update()
+
+    def _build_settings_dialog(self):
+        """构建应用设置对话框
+
+        Returns:
+            (对话框, 刷新函数)：刷新函数用 self.settings 的当前值填充各控件
+        """
         # 创建对话框中的设置组件
         # === 启动设置 ===
         auto_start_checkbox = ft.Checkbox(
             label=t("settings.auto_start"),
-            value=get_auto_start(),
         )
         start_minimized_checkbox = ft.Checkbox(
             label=t("settings.start_minimized"),
-            value=self.settings.start_minimized,
         )
         auto_run_checkbox = ft.Checkbox(
             label=t("settings.auto_run_server"),
-            value=self.settings.auto_run_server,
         )
         
         # === 关闭按钮行为 ===
@@ -602,14 +888,11 @@ class IFlow2ApiApp:
                 ft.dropdown.Option("minimize_to_tray", t("settings.close_action_minimize_to_tray")),
                 ft.dropdown.Option("minimize_to_taskbar", t("settings.close_action_minimize_to_taskbar")),
             ],
-            value=self.settings.close_action,
             width=300,
-            disabled=not is_tray_available() and self.settings.close_action == "minimize_to_tray",
         )
         
         # 关闭行为说明文本
         close_action_hint = ft.Text(
-            t(f"settings.close_action_hint_{self.settings.close_action}"),
             size=11,
             color=ft.Colors.OUTLINE,
         )
@@ -624,15 +907,14 @@ class IFlow2ApiApp:
         # === 内容处理设置 ===
         preserve_reasoning_checkbox = ft.Checkbox(
             label=t("settings.preserve_reasoning_content"),
-            value=self.settings.preserve_reasoning_content,
             tooltip=t("settings.preserve_reasoning_content_hint"),
         )
         
         # === 上游 API 并发设置 ===
         api_concurrency_field = ft.TextField(
             label=t("settings.api_concurrency"),
-            value=str(self.settings.api_concurrency),
             keyboard_type=ft.KeyboardType.NUMBER,
+            input_filter=ft.NumbersOnlyInputFilter(),
             width=100,
             tooltip=t("settings.api_concurrency_hint"),
         )
@@ -645,26 +927,23 @@ class IFlow2ApiApp:
                 ft.dropdown.Option("light", t("settings.theme.light")),
                 ft.dropdown.Option("dark", t("settings.theme.dark")),
             ],
-            value=self.settings.theme_mode,
             width=200,
         )
 
         # 语言下拉框
-        available_languages = get_available_languages()
+        available_languages = _AVAILABLE_LANGUAGES
         language_dropdown = ft.Dropdown(
             label=t("settings.language"),
             options=[
                 ft.dropdown.Option(lang_code, lang_name)
                 for lang_code, lang_name in available_languages.items()
             ],
-            value=self.settings.language,
             width=200,
         )
         
         # === 自定义 API 鉴权设置 ===
         custom_api_key_field = ft.TextField(
             label=t("settings.custom_api_key"),
-            value=self.settings.custom_api_key,
             password=True,
             can_reveal_password=True,
             hint_text=t("settings.custom_api_key_hint"),
@@ -673,7 +952,6 @@ class IFlow2ApiApp:
         
         custom_auth_header_field = ft.TextField(
             label=t("settings.custom_auth_header"),
-            value=self.settings.custom_auth_header,
             hint_text=t("settings.custom_auth_header_hint"),
             width=300,
         )
@@ -681,12 +959,10 @@ class IFlow2ApiApp:
         # === 代理设置 ===
         upstream_proxy_enabled_checkbox = ft.Checkbox(
             label=t("settings.upstream_proxy_enabled"),
-            value=self.settings.upstream_proxy_enabled,
         )
         
         upstream_proxy_field = ft.TextField(
             label=t("settings.upstream_proxy"),
-            value=self.settings.upstream_proxy,
             hint_text=t("settings.upstream_proxy_hint"),
             width=300,
         )
@@ -698,7 +974,10 @@ class IFlow2ApiApp:
                 success = set_auto_start(auto_start_checkbox.value)
                 if not success:
                     self._add_log(t("log.auto_start_failed"))
-            
+
+            # 记录修改前的设置，确认时未改动则不重新应用主题、不写盘
+            before = self.settings.model_dump()
+
             # 更新其他设置
             self.settings.start_minimized = start_minimized_checkbox.value
             self.settings.close_action = close_action_dropdown.value or "minimize_to_tray"
@@ -715,18 +994,16 @@ class IFlow2ApiApp:
             if new_language != self.settings.language:
                 self.settings.language = new_language
                 set_language(new_language)
+                self._build_state_config()
+                # 对话框文本已按旧语言生成，下次打开时重新构建
+                self._settings_dlg = None
+                self._settings_refresh = None
                 self._add_log(t("log.language_changed", language=available_languages.get(new_language, new_language)))
             
             # 更新上游 API 并发设置
-            try:
-                api_concurrency = int(api_concurrency_field.value or "1")
-                if api_concurrency < 1:
-                    api_concurrency = 1
-                elif api_concurrency > 10:
-                    api_concurrency = 10
-            except ValueError:
-                api_concurrency = 1
-            self.settings.api_concurrency = api_concurrency
+            # 输入框只接受数字，空值时回退默认值，并限制在 1-10
+            value = api_concurrency_field.value or ""
+            self.settings.api_concurrency = min(max(int(value), 1), 10) if value.isdecimal() else 1
             
             # 更新自定义 API 鉴权设置
             self.settings.custom_api_key = custom_api_key_field.value or ""
@@ -736,29 +1013,49 @@ class IFlow2ApiApp:
             self.settings.upstream_proxy_enabled = upstream_proxy_enabled_checkbox.value
             self.settings.upstream_proxy = upstream_proxy_field.value or ""
             
-            # 应用主题
-            self._apply_theme()
-            
-            # 保存设置到文件
-            save_settings(self.settings)
+            if self.settings.model_dump() != before:
+                # 应用主题
+                if self.settings.theme_mode != before["theme_mode"]:
+                    self._apply_theme()
+
+                # 保存设置到文件（后台线程写盘）
+                self._queue_save_settings()
             
             self._add_log(t("log.settings_saved"))
             self._show_snack_bar(t("message.settings_saved"))
             
             # 关闭对话框
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
+
+        def refresh():
+            """用当前设置刷新各控件的值"""
+            close_action = self.settings.close_action
+            auto_start_checkbox.value = get_auto_start()
+            start_minimized_checkbox.value = self.settings.start_minimized
+            auto_run_checkbox.value = self.settings.auto_run_server
+            close_action_dropdown.value = close_action
+            close_action_dropdown.disabled = not _TRAY_AVAILABLE and close_action == "minimize_to_tray"
+            close_action_hint.value = t(f"settings.close_action_hint_{close_action}")
+            preserve_reasoning_checkbox.value = self.settings.preserve_reasoning_content
+            api_concurrency_field.value = str(self.settings.api_concurrency)
+            theme_dropdown.value = self.settings.theme_mode
+            language_dropdown.value = self.settings.language
+            custom_api_key_field.value = self.settings.custom_api_key
+            custom_auth_header_field.value = self.settings.custom_auth_header
+            upstream_proxy_enabled_checkbox.value = self.settings.upstream_proxy_enabled
+            upstream_proxy_field.value = self.settings.upstream_proxy
 
         def on_cancel(e):
             """取消"""
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
 
         # 创建可滚动的内容
         settings_content = ft.Column(
@@ -849,21 +1146,14 @@ class IFlow2ApiApp:
             actions_alignment=ft.MainAxisAlignment.END,
         )
 
-        # 打开对话框
-        if hasattr(self.page, "open"):
-            self.page.open(dlg)
-        else:
-            dlg.open = True
-            self.page.add(dlg)
-            self.page.update()
+        return dlg, refresh
 
     def _update_settings_from_ui(self):
         """从 UI 更新配置"""
         self.settings.host = self.host_field.value or "0.0.0.0"
-        try:
-            self.settings.port = int(self.port_field.value or "28000")
-        except ValueError:
-            self.settings.port = 28000
+        # 端口输入框只接受数字，空值时回退默认端口
+        port = self.port_field.value or ""
+        self.settings.port = int(port) if port.isdecimal() else 28000
         self.settings.api_key = self.api_key_field.value or ""
         self.settings.base_url = self.base_url_field.value or "https://apis.iflow.cn/v1"
 
@@ -873,7 +1163,7 @@ class IFlow2ApiApp:
         if config:
             self.api_key_field.value = config.api_key
             self.base_url_field.value = config.base_url
-            self.page.update()
+            self._page_update()
             self._add_log(t("log.import_success"))
             self._show_snack_bar(t("message.import_success"))
         else:
@@ -882,10 +1172,7 @@ class IFlow2ApiApp:
 
     def _add_log_threadsafe(self, message: str):
         """线程安全的添加日志 - 从后台线程调用"""
-        try:
-            self.page.pubsub.send_all({"type": "add_log", "message": message})
-        except Exception:
-            pass
+        self._post_to_main({"type": "add_log", "message": message})
 
     def _login_with_iflow_oauth(self, e):
         """使用 iFlow OAuth 登录"""
@@ -915,10 +1202,9 @@ class IFlow2ApiApp:
         """
         def do_check():
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                has_update, release_info = loop.run_until_complete(check_for_updates())
-                loop.close()
+                # 在本后台线程中运行独立的事件循环，网络请求不占用 Flet 的事件循环；
+                # asyncio.run 保证异常时也会关闭循环
+                has_update, release_info = asyncio.run(check_for_updates())
 
                 if has_update and release_info:
                     # 检查是否跳过此版本（强制检查时忽略）
@@ -962,30 +1248,31 @@ class IFlow2ApiApp:
 
         def on_download(e):
             """下载更新"""
+            import webbrowser  # 仅此处使用，按需导入
             webbrowser.open(html_url)
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
 
         def on_skip(e):
             """跳过此版本"""
             self.settings.skip_version = new_version
-            save_settings(self.settings)
+            self._queue_save_settings()
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
 
         def on_later(e):
             """稍后提醒"""
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
 
         # 创建对话框内容
         content_column = ft.Column(
@@ -1032,11 +1319,11 @@ class IFlow2ApiApp:
 
         # 打开对话框
         if hasattr(self.page, "open"):
-            self.page.open(dlg)
+            self._page_open(dlg)
         else:
             dlg.open = True
-            self.page.add(dlg)
-            self.page.update()
+            self._page_add(dlg)
+            self._page_update()
 
     def _show_no_update_dialog(self):
         """显示已是最新版本的对话框"""
@@ -1044,10 +1331,10 @@ class IFlow2ApiApp:
 
         def on_close(e):
             if hasattr(self.page, "close"):
-                self.page.close(dlg)
+                self._page_close(dlg)
             else:
                 dlg.open = False
-                self.page.update()
+                self._page_update()
 
         dlg = ft.AlertDialog(
             title=ft.Row(
@@ -1074,11 +1361,11 @@ class IFlow2ApiApp:
 
         # 打开对话框
         if hasattr(self.page, "open"):
-            self.page.open(dlg)
+            self._page_open(dlg)
         else:
             dlg.open = True
-            self.page.add(dlg)
-            self.page.update()
+            self._page_add(dlg)
+            self._page_update()
 
     def _check_for_updates_manual(self, e):
         """手动检查更新"""
@@ -1,6 +1,7 @@
 """多语言支持模块 (i18n)"""
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
@@ -84,25 +85,11 @@ def t(key: str, default: Optional[str] = None, **kwargs) -> str:
     Returns:
         翻译后的字符串
     """
-    # 确保当前语言的翻译已加载
-    if _current_language not in _translations:
-        _translations[_current_language] = load_translation(_current_language)
-    
-    translation = _translations.get(_current_language, {})
-    
-    # 支持嵌套键，如 "app.title"
-    keys = key.split(".")
-    value = translation
-    for k in keys:
-        if isinstance(value, dict) and k in value:
-            value = value[k]
-        else:
-            # 翻译不存在，返回默认值或键本身
-            return default if default is not None else key
-    
-    if not isinstance(value, str):
+    value = _lookup(_current_language, key)
+    if value is None:
+        # 翻译不存在，返回默认值或键本身
         return default if default is not None else key
-    
+
     # 格式化字符串
     if kwargs:
         try:
@@ -113,6 +100,24 @@ def t(key: str, default: Optional[str] = None, **kwargs) -> str:
     return value
 
 
+@lru_cache(maxsize=512)
+def _lookup(language: str, key: str) -> Optional[str]:
+    """按语言查找翻译键对应的字符串（结果缓存，翻译文件加载后不再变化）"""
+    # 确保该语言的翻译已加载
+    if language not in _translations:
+        _translations[language] = load_translation(language)
+
+    # 支持嵌套键，如 "app.title"
+    value: Any = _translations.get(language, {})
+    for k in key.split("."):
+        if isinstance(value, dict) and k in value:
+            value = value[k]
+        else:
+            return None
+
+    return value if isinstance(value, str) else None
+
+
 def get_all_translations(language: str) -> dict[str, Any]:
     """获取指定语言的所有翻译"""
     if language not in _translations:
@@ -0,0 +1,41 @@
+"""JSON 编解码 - 优先使用 orjson，不可用时回退标准库 json"""
+
+import json
+from typing import Any
+
+# 尝试导入 orjson
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，统一捕获即可
+JSONDecodeError = json.JSONDecodeError
+
+
+if HAS_ORJSON:
+    def dumps(obj: Any) -> bytes:
+        """序列化为紧凑的 UTF-8 JSON 字节串"""
+        return orjson.dumps(obj)
+
+    def dumps_pretty(obj: Any) -> bytes:
+        """序列化为 2 空格缩进的 UTF-8 JSON 字节串（用于写配置文件）"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def loads(data: bytes | str) -> Any:
+        """解析 JSON（直接接受 bytes，无需先解码）"""
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """序列化为紧凑的 UTF-8 JSON 字节串"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_pretty(obj: Any) -> bytes:
+        """序列化为 2 空格缩进的 UTF-8 JSON 字节串（用于写配置文件）"""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def loads(data: bytes | str) -> Any:
+        """解析 JSON（直接接受 bytes，无需先解码）"""
+        return json.loads(data)
@@ -10,14 +10,15 @@ import hmac
 import hashlib
 import json
 import logging
+import os
 import re
 import time
 import uuid
-import secrets
 import platform
 import urllib.parse
 
 from typing import AsyncIterator, Literal, Optional, overload
+from . import jsonutil
 from .config import IFlowConfig
 from .transport import BaseUpstreamTransport, create_upstream_transport
 from .cpa import (
@@ -46,6 +47,11 @@ logger = logging.getLogger("iflow2api")
 # 保留常量以供 Aone 端点检测等使用
 IFLOW_USERINFO_URL = "https://iflow.cn/api/oauth/getUserInfo"
 
+# SSE 帧的固定字节片段（流式输出时直接拼接，避免逐帧格式化字符串再编码）
+SSE_DATA_PREFIX = b"data: "
+SSE_FRAME_END = b"\n\n"
+SSE_DONE_FRAME = b"data: [DONE]\n\n"
+
 
 def generate_signature(user_agent: str, session_id: str, timestamp: int, api_key: str) -> str | None:
     """
@@ -84,14 +90,16 @@ class IFlowProxy:
         self._conversation_id = str(uuid.uuid4())
         # 使用 CPA 模块生成用户 ID
         self._telemetry_user_id = generate_user_id_from_api_key(config.api_key or self._session_id)
+        # 请求头模板：host/会话 ID 等在实例生命周期内不变，只需构建一次
+        self._chat_headers_template = self._build_chat_headers_template()
 
     @staticmethod
     def _generate_traceparent() -> str:
         """生成 W3C Trace Context 的 traceparent。"""
         # 00-<32hex trace_id>-<16hex parent_id>-01
-        trace_id = secrets.token_hex(16)
-        parent_id = secrets.token_hex(8)
-        return f"00-{trace_id}-{parent_id}-01"
+        # 一次取 24 字节随机数：前 16 字节为 trace_id，后 8 字节为 parent_id
+        ids = os.urandom(24).hex()
+        return f"00-{ids[:32]}-{ids[32:]}-01"
 
     def _is_aone_endpoint(self) -> bool:
         """是否为 Aone 端点（iflow-cli 在此分支追加额外头）。"""
@@ -127,21 +135,27 @@ class IFlowProxy:
         # 同一轮请求链路中需复用同一个 traceparent（chat + telemetry）。
         traceparent_str = traceparent or self._generate_traceparent()
 
-        # 使用 CPA 模块构建有序请求头
-        # 注意：content-length 在发送时由 HTTP 客户端自动计算
-        headers_list = build_chat_headers(
+        # 复制模板后覆盖动态字段：已存在的键赋值不改变位置，头部顺序保持不变
+        # （api_key 会随 Token 刷新变化，因此每次读取）
+        headers = self._chat_headers_template.copy()
+        headers["Authorization"] = f"Bearer {self.config.api_key or ''}"
+        headers["x-iflow-signature"] = signature_str
+        headers["x-iflow-timestamp"] = str(timestamp)
+        headers["traceparent"] = traceparent_str
+        return headers
+
+    def _build_chat_headers_template(self) -> dict:
+        """使用 CPA 模块构建有序请求头模板（动态字段在 _get_headers 中填充）"""
+        # 注意：不设置 content-length，由 HTTP 客户端按实际请求体计算
+        headers = dict(build_chat_headers(
             host=self._extract_host(),
-            api_key=self.config.api_key or "",
+            api_key="",
             session_id=self._session_id,
             conversation_id=self._conversation_id,
-            signature=signature_str,
-            timestamp=str(timestamp),
-            traceparent=traceparent_str,
-            content_length=0,  # HTTP 客户端会自动设置
-        )
-
-        # 转换为字典
-        headers = dict(headers_list)
+            signature="",
+            timestamp="",
+            traceparent="",
+        ))
 
         # Aone 分支专有头。
         if self._is_aone_endpoint():
@@ -161,7 +175,7 @@ class IFlowProxy:
         parts = traceparent.split("-")
         if len(parts) == 4 and len(parts[1]) == 32:
             return parts[1]
-        return secrets.token_hex(16)
+        return os.urandom(16).hex()
 
     @staticmethod
     def _rand_observation_id() -> str:
@@ -653,6 +667,9 @@ class IFlowProxy:
         model = request_body.get("model", "")
         request_body = self._configure_model_request(request_body, model)
 
+        # 请求体只序列化一次，以原始字节发送给上游（避免 HTTP 客户端再用标准库 json 编码）
+        request_bytes = jsonutil.dumps(request_body)
+
         # 统一 trace 链路：同一轮 run_started/chat/run_error 复用同一个 trace_id
         traceparent = self._generate_traceparent()
         trace_id = self._extract_trace_id(traceparent)
@@ -683,7 +700,7 @@ class IFlowProxy:
                         "POST",
                         f"{self.base_url}/chat/completions",
                         headers=headers,
-                        json_body=request_body,
+                        data=request_bytes,
                         timeout=300.0,
                     ) as response:
                         # 检查状态码
@@ -723,8 +740,8 @@ class IFlowProxy:
                                     "finish_reason": "stop"
                                 }]
                             }
-                            yield ("data: " + json.dumps(error_chunk, ensure_ascii=False) + "\n\n").encode("utf-8")
-                            yield b"data: [DONE]\n\n"
+                            yield SSE_DATA_PREFIX + jsonutil.dumps(error_chunk) + SSE_FRAME_END
+                            yield SSE_DONE_FRAME
                             return
                         
                         # 流式读取响应
@@ -741,12 +758,12 @@ class IFlowProxy:
                                 if line_str.startswith("data:"):
                                     data_str = line_str[5:].strip()
                                     if data_str == "[DONE]":
-                                        yield b"data: [DONE]\n\n"
+                                        yield SSE_DONE_FRAME
                                         continue
                                     try:
                                         chunk_data = json.loads(data_str)
                                         chunk_data = self._normalize_stream_chunk(chunk_data, preserve_reasoning)
-                                        yield ("data: " + json.dumps(chunk_data, ensure_ascii=False) + "\n\n").encode("utf-8")
+                                        yield SSE_DATA_PREFIX + jsonutil.dumps(chunk_data) + SSE_FRAME_END
                                     except (json.JSONDecodeError, Exception):
                                         # 无法解析的 chunk 原样传递
                                         yield (line_str + "\n").encode("utf-8")
@@ -762,11 +779,11 @@ class IFlowProxy:
                                     try:
                                         chunk_data = json.loads(data_str)
                                         chunk_data = self._normalize_stream_chunk(chunk_data, preserve_reasoning)
-                                        yield ("data: " + json.dumps(chunk_data, ensure_ascii=False) + "\n\n").encode("utf-8")
+                                        yield SSE_DATA_PREFIX + jsonutil.dumps(chunk_data) + SSE_FRAME_END
                                     except (json.JSONDecodeError, Exception):
                                         yield (line_str + "\n").encode("utf-8")
                                 else:
-                                    yield b"data: [DONE]\n\n"
+                                    yield SSE_DONE_FRAME
                             elif line_str:
                                 yield (line_str + "\n").encode("utf-8")
                                 
@@ -790,7 +807,7 @@ class IFlowProxy:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
                     headers=self._get_headers(traceparent=traceparent),
-                    json_body=request_body,
+                    data=request_bytes,
                     timeout=300.0,
                 )
                 response.raise_for_status()
@@ -822,7 +839,7 @@ class IFlowProxy:
         self,
         method: str,
         path: str,
-        body: Optional[dict] = None,
+        body: Optional[dict | bytes] = None,
         stream: bool = False,
     ) -> dict | AsyncIterator[bytes]:
         """
@@ -831,7 +848,7 @@ class IFlowProxy:
         Args:
             method: HTTP 方法
             path: API 路径 (不含 base_url)
-            body: 请求体
+            body: 请求体；传入已序列化的 bytes 时原样透传，不再解析/重新编码
             stream: 是否流式响应
 
         Returns:
@@ -839,6 +856,10 @@ class IFlowProxy:
         """
         client = await self._get_client()
         url = f"{self.base_url}{path}"
+        if isinstance(body, bytes):
+            data, json_body = body, None
+        else:
+            data, json_body = None, body
 
         if stream and method.upper() == "POST":
             # 使用统一传输层的 stream 方法实现真正的流式传输
@@ -848,7 +869,8 @@ class IFlowProxy:
                         "POST",
                         url,
                         headers=self._get_headers(stream=True),
-                        json_body=body,
+                        data=data,
+                        json_body=json_body,
                         timeout=300.0,
                     ) as response:
                         response.raise_for_status()
@@ -866,7 +888,8 @@ class IFlowProxy:
                 method.upper(),
                 url,
                 headers=self._get_headers(),
-                json_body=body,
+                data=data,
+                json_body=json_body,
                 timeout=300.0,
             )
         elif method.upper() == "DELETE":
@@ -7,6 +7,8 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from . import jsonutil
+
 
 class RateLimitConfig(BaseModel):
     """速率限制配置"""
@@ -248,44 +250,69 @@ def init_limiter(config: RateLimitConfig) -> None:
         )
 
 
-def create_rate_limit_middleware():
-    """创建速率限制中间件
-    
-    Returns:
-        中间件函数
+class RateLimitMiddleware:
+    """速率限制中间件
+
+    纯 ASGI 实现，避免 BaseHTTPMiddleware 的额外开销；
+    通过 app.add_middleware(RateLimitMiddleware) 注册。
     """
-    from fastapi import Request, Response
-    from fastapi.responses import JSONResponse
-    
-    async def rate_limit_middleware(request: Request, call_next):
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
         # 检查是否启用速率限制
-        if _rate_limit_config is None or not _rate_limit_config.enabled:
-            return await call_next(request)
-        
+        if (
+            scope["type"] != "http"
+            or _rate_limit_config is None
+            or not _rate_limit_config.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
         # 获取客户端标识（优先使用 API Key，其次使用 IP）
-        client_id = request.headers.get("Authorization", "")
+        client_id = ""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                client_id = value.decode("latin-1")
+                break
         if client_id:
             # 使用 API Key 的前 20 个字符作为标识
             client_id = client_id[:20]
         else:
             # 使用客户端 IP
-            client_id = request.client.host if request.client else "unknown"
-        
+            client = scope.get("client")
+            client_id = client[0] if client else "unknown"
+
         # 检查速率限制
         allowed, error_msg = check_rate_limit(client_id)
-        
+
         if not allowed:
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "error": {
-                        "message": error_msg,
-                        "type": "rate_limit_error",
-                        "code": "rate_limit_exceeded"
-                    }
+            body = jsonutil.dumps({
+                "error": {
+                    "message": error_msg,
+                    "type": "rate_limit_error",
+                    "code": "rate_limit_exceeded"
                 }
-            )
-        
-        return await call_next(request)
-    
-    return rate_limit_middleware
+            })
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        await self.app(scope, receive, send)
+
+
+def create_rate_limit_middleware():
+    """创建速率限制中间件
+
+    Returns:
+        ASGI 中间件类，用法: app.add_middleware(create_rate_limit_middleware())
+    """
+    return RateLimitMiddleware
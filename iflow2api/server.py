@@ -1,6 +1,5 @@
 """服务管理 - 在后台线程运行 uvicorn"""
 
-import asyncio
 import socket
 import threading
 import time
@@ -119,6 +118,7 @@ class ServerManager:
             from . import app as app_module
             app_module._proxy = None
             app_module._config = None
+            app_module.app.state.proxy = None
 
             # 直接导入 app 对象，避免打包后字符串导入失败
             from .app import app
@@ -131,13 +131,20 @@ class ServerManager:
                 log_level="info",
                 access_log=True,
                 log_config=None,  # 不覆盖我们在 logging_setup 中配置的日志 handler
+                # 优先使用 uvloop + httptools（Windows 无 uvloop 时自动回退 asyncio）
+                loop="auto",
+                http="auto",
+                limit_concurrency=self._settings.limit_concurrency or 1000,
+                backlog=self._settings.backlog or 4096,
+                timeout_keep_alive=self._settings.timeout_keep_alive or 75,
             )
 
             self._server = uvicorn.Server(config)
             self._set_state(ServerState.RUNNING)
 
-            # 运行服务
-            asyncio.run(self._server.serve())
+            # 运行服务 - Server.run() 会按 config.loop 创建事件循环（uvloop），
+            # 直接 asyncio.run(serve()) 则始终使用默认的 asyncio 循环
+            self._server.run()
 
         except OSError as e:
             # 端口绑定错误
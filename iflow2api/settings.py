@@ -2,6 +2,10 @@
 
 import json
 import logging
+import os
+import stat
+import tempfile
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -9,7 +13,7 @@ from pydantic import BaseModel, Field
 
 logger = logging.getLogger("iflow2api")
 
-from .config import load_iflow_config, save_iflow_config, IFlowConfig
+from .config import load_iflow_config, save_iflow_config, invalidate_config_cache, IFlowConfig
 from .crypto import ConfigEncryption
 from .autostart import set_auto_start as _set_auto_start
 from .autostart import get_auto_start as _get_auto_start
@@ -73,6 +77,17 @@ class AppSettings(BaseModel):
     upstream_transport_backend: str = "curl_cffi"
     tls_impersonate: str = "chrome124"
 
+    # uvicorn 服务端调优（仅配置文件可改）
+    # - limit_concurrency: 同时处理的最大连接/任务数，超出直接返回 503，避免长连接流式响应耗尽 fd
+    # - backlog: 监听 socket 的等待队列长度，应对突发连接
+    # - timeout_keep_alive: HTTP keep-alive 空闲超时（秒）
+    limit_concurrency: int = Field(default=1000, ge=1)
+    backlog: int = Field(default=4096, ge=1)
+    timeout_keep_alive: int = Field(default=75, ge=1)
+
+
+# save_settings 串行化：GUI 写盘线程与管理页接口可能同时保存
+_save_lock = threading.Lock()
 
 # lazy singleton for token encryption
 _config_encryption: Optional[ConfigEncryption] = None
@@ -191,6 +206,13 @@ def load_settings() -> AppSettings:
                     settings.upstream_transport_backend = data["upstream_transport_backend"]
                 if "tls_impersonate" in data:
                     settings.tls_impersonate = data["tls_impersonate"]
+                # uvicorn 服务端调优
+                if "limit_concurrency" in data:
+                    settings.limit_concurrency = data["limit_concurrency"]
+                if "backlog" in data:
+                    settings.backlog = data["backlog"]
+                if "timeout_keep_alive" in data:
+                    settings.timeout_keep_alive = data["timeout_keep_alive"]
         except Exception as _e:
             logger.warning("读取应用配置文件失败: %s", _e)
 
@@ -264,30 +286,51 @@ def save_settings(settings: AppSettings) -> None:
         # 上游传输层设置（TLS 指纹对齐）
         "upstream_transport_backend": settings.upstream_transport_backend,
         "tls_impersonate": settings.tls_impersonate,
+        # uvicorn 服务端调优
+        "limit_concurrency": settings.limit_concurrency,
+        "backlog": settings.backlog,
+        "timeout_keep_alive": settings.timeout_keep_alive,
     }
 
-    config_path = get_config_path()
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(app_data, f, indent=2, ensure_ascii=False)
-
-    # 2. 同时保存到 ~/.iflow/settings.json 以保持兼容性（Docker 中可能只读，忽略错误）
-    try:
-        existing_config = load_iflow_config()
-    except (FileNotFoundError, ValueError):
-        existing_config = IFlowConfig(api_key="", base_url="https://apis.iflow.cn/v1")
-
-    # 只在 API Key 或 Base URL 发生变化时更新
-    if (
-        existing_config.api_key != settings.api_key
-        or existing_config.base_url != settings.base_url
-    ):
-        existing_config.api_key = settings.api_key
-        existing_config.base_url = settings.base_url
+    with _save_lock:
+        config_path = get_config_path()
+        # 先写临时文件再原子替换，避免写入中途崩溃导致配置文件被截断；
+        # 临时文件名唯一（mkstemp，权限 600），不会与其他写入者的临时文件互相覆盖
+        fd, tmp_name = tempfile.mkstemp(dir=config_dir, prefix=config_path.name + ".", suffix=".tmp")
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(app_data, f, indent=2, ensure_ascii=False)
+            try:
+                # 保留原文件权限（含加密 token，用户可能设置了 600）
+                os.chmod(tmp_path, stat.S_IMODE(config_path.stat().st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, config_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        # 应用主配置影响登录状态判断，清除缓存
+        invalidate_config_cache()
+
+        # 2. 同时保存到 ~/.iflow/settings.json 以保持兼容性（Docker 中可能只读，忽略错误）
         try:
-            save_iflow_config(existing_config)
-        except (PermissionError, OSError) as e:
-            # Docker 中 ~/.iflow 可能只读挂载，忽略写入错误
-            logger.debug("无法写入 ~/.iflow/settings.json（可能是只读挂载）: %s", e)
+            existing_config = load_iflow_config()
+        except (FileNotFoundError, ValueError):
+            existing_config = IFlowConfig(api_key="", base_url="https://apis.iflow.cn/v1")
+
+        # 只在 API Key 或 Base URL 发生变化时更新
+        if (
+            existing_config.api_key != settings.api_key
+            or existing_config.base_url != settings.base_url
+        ):
+            existing_config.api_key = settings.api_key
+            existing_config.base_url = settings.base_url
+            try:
+                save_iflow_config(existing_config)
+            except (PermissionError, OSError) as e:
+                # Docker 中 ~/.iflow 可能只读挂载，忽略写入错误
+                logger.debug("无法写入 ~/.iflow/settings.json（可能是只读挂载）: %s", e)
 
 
 def set_auto_start(enabled: bool) -> bool:
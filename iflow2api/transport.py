@@ -168,6 +168,13 @@ class HttpxTransport(BaseUpstreamTransport):
             kwargs["proxy"] = proxy
         self._client = httpx.AsyncClient(**kwargs)
 
+    @staticmethod
+    def _split_raw_content(data: Any) -> tuple[Any, Any]:
+        """httpx 要求原始 bytes/str 请求体走 content 参数（data 仅用于表单）。"""
+        if isinstance(data, (bytes, str)):
+            return data, None
+        return None, data
+
     async def request(
         self,
         method: str,
@@ -179,11 +186,13 @@ class HttpxTransport(BaseUpstreamTransport):
         json_body: Any = None,
         timeout: Optional[float] = None,
     ) -> UpstreamResponse:
+        content, data = self._split_raw_content(data)
         response = await self._client.request(
             method,
             url,
             headers=headers,
             params=params,
+            content=content,
             data=data,
             json=json_body,
             timeout=timeout,
@@ -202,11 +211,13 @@ class HttpxTransport(BaseUpstreamTransport):
         json_body: Any = None,
         timeout: Optional[float] = None,
     ) -> AsyncIterator[UpstreamResponse]:
+        content, data = self._split_raw_content(data)
         async with self._client.stream(
             method,
             url,
             headers=headers,
             params=params,
+            content=content,
             data=data,
             json=json_body,
             timeout=timeout,
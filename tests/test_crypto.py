@@ -0,0 +1,81 @@
+"""配置加密模块测试"""
+
+import base64
+import types
+
+import pytest
+from cryptography.fernet import Fernet
+
+from iflow2api import crypto
+
+
+class _FakeRFernet:
+    """模拟 rfernet.Fernet：str 密钥，encrypt 返回 str，decrypt 只接受 str"""
+
+    def __init__(self, key: str):
+        assert isinstance(key, str)
+        self._inner = Fernet(key.encode("ascii"))
+
+    def encrypt(self, data: bytes) -> str:
+        return self._inner.encrypt(data).decode("ascii")
+
+    def decrypt(self, token: str) -> bytes:
+        if not isinstance(token, str):
+            raise TypeError("token must be str")
+        return self._inner.decrypt(token.encode("ascii"))
+
+
+@pytest.fixture
+def rfernet_backend(monkeypatch):
+    """把 Fernet 实现切换为（模拟的）rfernet 适配器"""
+    monkeypatch.setattr(crypto, "_rfernet", types.SimpleNamespace(Fernet=_FakeRFernet))
+    monkeypatch.setattr(crypto, "_fernet_cls", crypto._RFernetAdapter)
+
+
+@pytest.fixture(params=["cryptography", "rfernet"])
+def encryption(request, monkeypatch):
+    if request.param == "rfernet":
+        request.getfixturevalue("rfernet_backend")
+    else:
+        monkeypatch.setattr(crypto, "_fernet_cls", Fernet)
+    return crypto.ConfigEncryption(Fernet.generate_key())
+
+
+def test_encrypt_decrypt_roundtrip(encryption):
+    token = encryption.encrypt("sk-测试")
+    assert isinstance(token, str)
+    assert encryption.decrypt(token) == "sk-测试"
+
+
+def test_encrypt_dict_roundtrip(encryption):
+    data = {"api_key": "sk-1", "oauth_refresh_token": "rt-2", "base_url": "https://x", "token": ""}
+    stored = encryption.encrypt_dict(data)
+    assert stored["api_key"].startswith("enc:")
+    assert stored["oauth_refresh_token"].startswith("enc:")
+    assert stored["base_url"] == "https://x"
+    assert stored["token"] == ""
+    assert encryption.decrypt_dict(stored) == data
+
+
+def test_decrypt_legacy_double_base64_token(encryption):
+    # 旧版格式：Fernet 令牌外层再做一次 base64
+    token = encryption.encrypt("legacy")
+    legacy = base64.urlsafe_b64encode(token.encode("ascii")).decode("ascii")
+    assert encryption.decrypt(legacy) == "legacy"
+
+
+def test_backends_are_interchangeable(rfernet_backend):
+    key = Fernet.generate_key()
+    token = Fernet(key).encrypt(b"shared").decode("ascii")
+    assert crypto.ConfigEncryption(key).decrypt(token) == "shared"
+
+    adapter_token = crypto._RFernetAdapter(key).encrypt(b"shared")
+    assert isinstance(adapter_token, bytes)
+    assert Fernet(key).decrypt(adapter_token) == b"shared"
+
+
+def test_decrypt_with_wrong_key_raises_value_error(encryption):
+    token = encryption.encrypt("secret")
+    other = crypto.ConfigEncryption(Fernet.generate_key())
+    with pytest.raises(ValueError):
+        other.decrypt(token)